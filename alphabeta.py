@@ -0,0 +1,302 @@
+"""
+Alpha-beta search bot for Blokus.
+
+Searches with iterative deepening until a deadline, ordering moves
+so that large pieces and placements that open many new corners are
+tried first, and caching results in a bounded transposition table
+keyed by Blokus.zobrist_hash.
+
+With more than two players the search is "paranoid": every
+opponent is assumed to play against the bot, which turns the game
+into a two-sided one that alpha-beta can prune.
+"""
+import random
+import time
+from typing import Callable, NamedTuple, Optional
+
+from blokus import SHAPE_SIZES, Blokus
+from mcts import TreeMove, play, tree_moves
+from orientations import Placement
+
+# Whether a value stored for a position is exact or only a lower
+# or upper bound, because the search that found it was cut off.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def bound_flag(value: float, alpha: float, beta: float) -> int:
+    """
+    Returns the flag of a value found by a search within the
+    window (alpha, beta).
+    """
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
+
+
+def bound_decides(value: float, flag: int, alpha: float, beta: float) -> bool:
+    """
+    Returns whether a stored value with the given flag settles a
+    search within the window (alpha, beta), so that the stored
+    value can be returned without searching.
+    """
+    return (flag == EXACT
+            or (flag == LOWER and value >= beta)
+            or (flag == UPPER and value <= alpha))
+
+
+def search_moves(game: Blokus, moves: list[TreeMove], maximizing: bool,
+                 alpha: float, beta: float,
+                 search: Callable[[float, float], float]) -> tuple[float, TreeMove]:
+    """
+    Plays each move in turn, values the resulting position with
+    search(alpha, beta), and undoes it, narrowing the window as
+    values come in and stopping once it closes. Returns the best
+    value for the side to move (the maximizing side or not) and
+    the move that reached it (None if there are no moves).
+    """
+    best_value = -float("inf") if maximizing else float("inf")
+    best_move: TreeMove = None
+    for move in moves:
+        play(game, move)
+        try:
+            value = search(alpha, beta)
+        finally:
+            game.undo()
+
+        if maximizing:
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+        else:
+            if value < best_value:
+                best_value, best_move = value, move
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+    return best_value, best_move
+
+
+class _Entry(NamedTuple):
+    """
+    A transposition table entry: the value of a position
+    searched to depth, which is exact or a lower or upper bound
+    (flag), the best move found there, and whether the search
+    reached the end of the game everywhere (complete).
+    """
+
+    depth: int
+    value: float
+    flag: int
+    move: TreeMove
+    complete: bool
+
+
+class _Timeout(Exception):
+    """
+    Raised inside the search when the deadline has passed.
+    """
+
+
+class AlphaBetaBot:
+    """
+    An iterative-deepening, paranoid alpha-beta player. An
+    instance is a simulate.Policy.
+
+    Each search stops at time_limit seconds, after max_depth
+    plies, or once an iteration reaches the end of the game along
+    every line searched, and returns the best move of the deepest
+    completed iteration. tt_size bounds the number of transposition table
+    entries (the oldest entries are evicted first). If max_moves
+    is set, only the first max_moves moves in the search order
+    are searched at each node, which trades accuracy for depth.
+
+    Counters from the most recent search (nodes, tt_probes,
+    tt_hits, depth, elapsed) are kept for tuning.
+    """
+
+    time_limit: float
+    max_depth: int
+    tt_size: int
+    max_moves: Optional[int]
+    mobility_weight: float
+    nodes: int
+    tt_probes: int
+    tt_hits: int
+    depth: int
+    elapsed: float
+    _table: dict[tuple[int, int], _Entry]
+    _player: int
+    _deadline: float
+    _cutoffs: int
+
+    def __init__(self, time_limit: float = 1.0, max_depth: int = 64,
+                 tt_size: int = 1_000_000, max_moves: Optional[int] = None,
+                 mobility_weight: float = 0.5) -> None:
+        """
+        Constructor
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt_size = tt_size
+        self.max_moves = max_moves
+        self.mobility_weight = mobility_weight
+        self.nodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.depth = 0
+        self.elapsed = 0.0
+        self._table = {}
+        self._player = 0
+        self._deadline = 0.0
+        self._cutoffs = 0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        """
+        Returns the number of nodes searched per second during
+        the most recent search.
+        """
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        """
+        Returns the fraction of transposition table probes during
+        the most recent search that found a usable entry.
+        """
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def __call__(self, game: Blokus, moves: list[Placement],
+                 rng: random.Random) -> Placement:
+        """
+        Searches from the current position of the game, and
+        returns the best of the given legal moves found before
+        the deadline.
+        """
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit
+        self._player = game.curr_player
+        self.nodes = self.tt_probes = self.tt_hits = self.depth = 0
+
+        ordered: list[TreeMove] = self._order(game, list(moves), None)
+        best = ordered[0]
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self._cutoffs = 0
+                _, best = self._root(game, ordered, depth)
+                self.depth = depth
+                ordered.remove(best)
+                ordered.insert(0, best)
+                if not self._cutoffs:
+                    # Deeper iterations would search the same tree.
+                    break
+        except _Timeout:
+            pass
+        self.elapsed = time.perf_counter() - start
+
+        assert best is not None
+        return best
+
+    def _root(self, game: Blokus, moves: list[TreeMove],
+              depth: int) -> tuple[float, TreeMove]:
+        """
+        Searches each root move to the given depth, and returns
+        the best value and move.
+        """
+        return search_moves(game, moves, True, -float("inf"), float("inf"),
+                            lambda a, b: self._search(game, depth - 1, a, b))
+
+    def _search(self, game: Blokus, depth: int, alpha: float,
+                beta: float) -> float:
+        """
+        Returns the paranoid value of the game's position for the
+        bot's player, searched to the given depth, within the
+        window (alpha, beta).
+        """
+        self.nodes += 1
+        if game.game_over:
+            return self._evaluate(game)
+        if depth == 0:
+            self._cutoffs += 1
+            return self._evaluate(game)
+        # Interior nodes generate and order every legal move, which
+        # costs far more than reading the clock.
+        if time.perf_counter() > self._deadline:
+            raise _Timeout
+
+        key = (game.zobrist_hash, self._player)
+        self.tt_probes += 1
+        entry = self._table.get(key)
+        hint = None
+        if entry is not None:
+            hint = entry.move
+            if entry.depth >= depth and bound_decides(entry.value, entry.flag,
+                                                      alpha, beta):
+                self.tt_hits += 1
+                if not entry.complete:
+                    self._cutoffs += 1
+                return entry.value
+
+        cutoffs = self._cutoffs
+        moves = self._order(game, tree_moves(game), hint)
+        if self.max_moves is not None:
+            moves = moves[:self.max_moves]
+        best_value, best_move = search_moves(
+            game, moves, game.curr_player == self._player, alpha, beta,
+            lambda a, b: self._search(game, depth - 1, a, b))
+        self._store(key, _Entry(depth, best_value,
+                                bound_flag(best_value, alpha, beta),
+                                best_move, self._cutoffs == cutoffs))
+        return best_value
+
+    def _store(self, key: tuple[int, int], entry: _Entry) -> None:
+        """
+        Adds an entry to the transposition table, evicting the
+        oldest entry if the table is full.
+        """
+        table = self._table
+        if key not in table and len(table) >= self.tt_size:
+            del table[next(iter(table))]
+        table[key] = entry
+
+    def _order(self, game: Blokus, moves: list[TreeMove],
+               hint: TreeMove) -> list[TreeMove]:
+        """
+        Returns the moves in search order: the hint (the best move
+        from the transposition table) first, then larger pieces
+        before smaller ones and, among pieces of the same size,
+        those with more corners on the board first.
+        """
+        size = game.size
+
+        def key(move: TreeMove) -> tuple[int, int, int]:
+            if move is None:
+                return (1, 0, 0)
+            corners = sum(0 <= r < size and 0 <= c < size
+                          for r, c in move.intercardinal_neighbors())
+            return (move != hint, -SHAPE_SIZES[move.kind], -corners)
+
+        return sorted(moves, key=key)
+
+    def _evaluate(self, game: Blokus) -> float:
+        """
+        Returns the heuristic value of a position for the bot's
+        player: their score minus the best opponent's score, plus
+        mobility_weight times the difference in the number of
+        frontier squares (while the game is on).
+        """
+        player = self._player
+        opponents = [p for p in range(1, game.num_players + 1) if p != player]
+        value = float(game.get_score(player))
+        if opponents:
+            value -= max(game.get_score(p) for p in opponents)
+        if not game.game_over:
+            mobility = game.corner_count(player)
+            if opponents:
+                mobility -= max(game.corner_count(p) for p in opponents)
+            value += self.mobility_weight * mobility
+        return value
@@ -0,0 +1,52 @@
+"""
+Bitboard helpers for Blokus.
+
+A set of squares on a (size x size) board is represented as a
+single arbitrary-precision integer, in which the square (r, c)
+corresponds to bit number r * size + c. Collision and contact
+tests between sets of squares then become bitwise ANDs.
+"""
+from typing import Iterable, Iterator
+
+from piece import Point
+
+
+def square_bit(point: Point, size: int) -> int:
+    """
+    Returns the bit index of the given (on-board) point.
+    """
+    r, c = point
+    return r * size + c
+
+
+def squares_mask(squares: Iterable[Point], size: int) -> int:
+    """
+    Returns the mask with a bit set for each of the given
+    squares. Squares beyond the bounds of the board are
+    ignored.
+    """
+    mask = 0
+    for r, c in squares:
+        if 0 <= r < size and 0 <= c < size:
+            mask |= 1 << (r * size + c)
+    return mask
+
+
+def mask_bits(mask: int) -> Iterator[int]:
+    """
+    Yields the indices of the bits set in the given mask,
+    in increasing order.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_squares(mask: int, size: int) -> Iterator[Point]:
+    """
+    Yields the points corresponding to the bits set in
+    the given mask, in increasing bit order.
+    """
+    for index in mask_bits(mask):
+        yield divmod(index, size)
@@ -1,14 +1,131 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from functools import lru_cache
+import struct
+from typing import Iterable, Iterator, NamedTuple, Optional
 
 from base import BlokusBase
+from bitboard import mask_bits, mask_squares, squares_mask
+from orientations import ORIENTATIONS, Move, Placement
 from shape_definitions import ShapeKind
-from piece import Point, Shape, Piece
+from piece import CARDINAL_OFFSETS, SHAPES, Point, Shape, Piece
 from shape_definitions import definitions
+from zobrist import (DEFAULT_SEED, ZobristKeys, position_hash, squares_hash,
+                     zobrist_keys)
 
 Cell = Optional[tuple[int, ShapeKind]]
 Grid = list[list[Cell]]
 
+# Each player's remaining shapes are tracked as a 21-bit mask,
+# with one bit per ShapeKind, numbered in enum order.
+SHAPE_INDEX: dict[ShapeKind, int] = {
+    kind: i for i, kind in enumerate(ShapeKind)
+}
+SHAPE_BITS: dict[ShapeKind, int] = {
+    kind: 1 << i for kind, i in SHAPE_INDEX.items()
+}
+ALL_SHAPES_MASK = (1 << len(SHAPE_BITS)) - 1
+
+# Number of squares in each shape, for scoring.
+SHAPE_SIZES: dict[ShapeKind, int] = {
+    kind: len(shape.squares) for kind, shape in SHAPES.items()
+}
+
+# Any piece covering a square lies within this many rows and
+# columns of it.
+REACH = max(max(o.height, o.width) for os in ORIENTATIONS.values()
+            for o in os) - 1
+
+
+# Snapshots (see Blokus.to_bytes) start with a header: format
+# version, board size, number of players, current player, retired
+# players and players whose last piece was ShapeKind.ONE (bitmasks,
+# bit p - 1 for player p), Zobrist seed, number of start positions.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<BBBBBBQB")
+
+# Bits per cell of a snapshot: the number of the player whose
+# piece covers the cell, or 0.
+CELL_BITS = 3
+
+
+def _pieces(mask: int, size: int) -> Iterator[list[Point]]:
+    """
+    Yields the squares of each group of edge-connected squares
+    of the mask. A player's pieces never share an edge, so each
+    group of a player's squares is one of their pieces.
+    """
+    cells = set(mask_squares(mask, size))
+    while cells:
+        stack = [cells.pop()]
+        piece = []
+        while stack:
+            r, c = stack.pop()
+            piece.append((r, c))
+            for dr, dc in CARDINAL_OFFSETS:
+                neighbor = (r + dr, c + dc)
+                if neighbor in cells:
+                    cells.remove(neighbor)
+                    stack.append(neighbor)
+        yield piece
+
+
+@lru_cache(maxsize=None)
+def _orientation_masks(size: int) -> dict[ShapeKind, tuple[int, ...]]:
+    """
+    Returns, for each shape kind, the masks of its orientations
+    (by index) on a board of the given size, with the top left
+    corner of the bounding box at (0, 0).
+    """
+    return {
+        kind: tuple(squares_mask(o.offsets, size) for o in orientations)
+        for kind, orientations in ORIENTATIONS.items()
+    }
+
+
+@lru_cache(maxsize=1 << 16)
+def _neighbor_masks(size: int, kind: ShapeKind, index: int,
+                    anchor: Point) -> tuple[int, int]:
+    """
+    Returns the masks of the cardinal and intercardinal neighbors
+    on a board of the given size of the placement of orientation
+    index of kind at anchor.
+    """
+    placement = Placement(ORIENTATIONS[kind][index], anchor)
+    return (squares_mask(placement.cardinal_neighbors(), size),
+            squares_mask(placement.intercardinal_neighbors(), size))
+
+
+@lru_cache(maxsize=None)
+def _reach_masks(size: int) -> tuple[int, ...]:
+    """
+    Returns, for each square of a board of the given size, the
+    mask of the squares within REACH rows and columns of it.
+    """
+    return tuple(
+        squares_mask([(r + dr, c + dc)
+                      for dr in range(-REACH, REACH + 1)
+                      for dc in range(-REACH, REACH + 1)], size)
+        for r in range(size) for c in range(size))
+
+class _Undo(NamedTuple):
+    """
+    What Blokus.undo needs to revert one placement or retirement
+    by player (who was the current player at the time). kind is
+    None for a retirement; the masks and score are the player's
+    values from before a placement.
+    """
+
+    player: int
+    kind: Optional[ShapeKind]
+    mask: int
+    edge_mask: int
+    corner_mask: int
+    frontier: tuple[int, ...]
+    score: int
+    retired: bool
+    hash: int
+
+
 class Blokus(BlokusBase):
     """
     Blokus class to be implemented for testing later
@@ -16,18 +133,32 @@ class Blokus(BlokusBase):
     _num_players: int
     _size: int
     _start_positions: set[Point]
-    _shapes: dict[ShapeKind, Shape]
     _curr_player: int
-    _grid: Grid
+    _grid: Optional[Grid]
     _num_moves: int
     _retired_players: set
-    _all_shapes: dict
+    _played_pieces: list[tuple[int, ShapeKind, list[Point]]]
+    _start_mask: int
+    _occupied: int
+    _player_masks: list[int]
+    _edge_masks: list[int]
+    _corner_masks: list[int]
+    _frontier: list[int]
+    _remaining: list[int]
+    _scores: list[int]
+    _history: list[_Undo]
+    _zobrist_seed: int
+    _zobrist: ZobristKeys
+    _hash: int
+    _orientation_masks: dict[ShapeKind, tuple[int, ...]]
+    _mobility: list[dict[int, tuple[int, dict[ShapeKind, int]]]]
 
     def __init__(
         self,
         num_players: int,
         size: int,
         start_positions: set[Point],
+        zobrist_seed: int = DEFAULT_SEED,
     ) -> None:
         """
         Subclasses should have constructors which accept these
@@ -37,6 +168,9 @@ class Blokus(BlokusBase):
             size: Number of squares on each side of the board
             start_positions: Positions for players' first moves
 
+        zobrist_seed selects the random keys used for
+        zobrist_hash (see zobrist.py).
+
         Raises ValueError...
             if num_players is less than 1 or more than 4,
             if the size is less than 5,
@@ -59,15 +193,14 @@ class Blokus(BlokusBase):
                     raise ValueError
         if len(start_positions) < num_players:
             raise ValueError
-        self._grid = [[None] * size for _ in range(size)]
         self._num_players = num_players
         self._size = size
         self._start_positions = start_positions
-        self._retired_players = set()
-        self._all_shapes = {}
-        self._curr_player = 1
-        self._num_moves = 0
-        self._played_pieces = []
+        self._start_mask = squares_mask(start_positions, size)
+        self._zobrist_seed = zobrist_seed
+        self._zobrist = zobrist_keys(size, num_players, zobrist_seed)
+        self._orientation_masks = _orientation_masks(size)
+        self.reset()
     #
     # PROPERTIES
     #
@@ -86,13 +219,11 @@ class Blokus(BlokusBase):
         origin at the middle (third) square.
 
         See shape_definitions.py for more details.
-        """
-        for int, shape in enumerate(definitions):
-            shape_name = "shape_" + str(int)
-            shape_name = Shape.from_string(shape, definitions[shape])
-            self._all_shapes.update({shape_name.kind: shape_name})
 
-        return self._all_shapes
+        The shapes are parsed once per process (see piece.SHAPES)
+        and are read-only; use a Piece to transform one.
+        """
+        return dict(SHAPES)
 
     @property
     def size(self) -> int:
@@ -146,9 +277,30 @@ class Blokus(BlokusBase):
         a piece that occupies this square; and the shape kind
         of that piece. If no played piece occupies this square,
         then the Cell is None.
+
+        The board is stored as bitmasks (see bitboard.py), so
+        the grid is materialized from the played pieces on
+        first access after each move.
         """
+        if self._grid is None:
+            grid: Grid = [[None] * self._size for _ in range(self._size)]
+            for player, kind, squares in self._played_pieces:
+                for r, c in squares:
+                    grid[r][c] = (player, kind)
+            self._grid = grid
         return self._grid
 
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        Returns a 64-bit Zobrist hash of the current position:
+        the occupied squares and their players, the player to
+        move, the retired players, the shapes each player has
+        played and who finished with ONE last. Equal positions in games with the same size,
+        number of players and zobrist_seed have equal hashes.
+        """
+        return self._hash
+
     @property
     def game_over(self) -> bool:
         """
@@ -160,12 +312,12 @@ class Blokus(BlokusBase):
             return True
 
         if len(self._retired_players) == 1 and self._num_players == 2:
-            if len(self.remaining_shapes(self.curr_player)) == 0:
+            if self._remaining[self._curr_player] == 0:
                 return True
 
         done = 0
         for num in range(1, self.num_players + 1):
-            if len(self.remaining_shapes(num)) == 0:
+            if self._remaining[num] == 0:
                 done += 1
         if (done + (len(self._retired_players))) == self.num_players:
             return True
@@ -178,18 +330,11 @@ class Blokus(BlokusBase):
         Returns the (one or more) players who have the highest
         score. Returns None if the game is not over.
         """
-        winners_lst = []
-        high_score = -999
         if self.game_over:
-            for player in range(1, self.num_players + 1):
-                curr_score = self.get_score(player)
-                high_score = max(high_score, curr_score)
-
-            for player in range(1, self.num_players + 1):
-                curr_score = self.get_score(player)
-                if curr_score == high_score:
-                    winners_lst.append(player)
-            return winners_lst
+            scores = self._scores[1:]
+            high_score = max(scores)
+            return [player for player, score in enumerate(scores, 1)
+                    if score == high_score]
 
         return None
 
@@ -202,19 +347,17 @@ class Blokus(BlokusBase):
         Returns a list of shape kinds that a particular
         player has not yet played.
         """
-        played_shapes = set()
-        for row in self.grid:
-            for cell in row:
-                if cell is not None and cell[0] == player:
-                    played_shapes.add(cell[1])
+        remaining = self._remaining[player]
+        return [kind for kind in definitions if remaining & SHAPE_BITS[kind]]
 
-        remaining_shapes_list = []
-        for shape in self.shapes.keys():
-            if shape not in played_shapes:
-                remaining_shapes_list.append(shape)
-        return remaining_shapes_list
+    def remaining_mask(self, player: int) -> int:
+        """
+        Returns the shape kinds that a particular player has
+        not yet played, as a mask of SHAPE_BITS.
+        """
+        return self._remaining[player]
 
-    def any_wall_collisions(self, piece: Piece) -> bool:
+    def any_wall_collisions(self, piece: Move) -> bool:
         """
         Returns a boolean indicating whether or not the
         given piece (not yet played on the board) would
@@ -229,14 +372,9 @@ class Blokus(BlokusBase):
         Raises ValueError if the anchor of the piece
         is None.
         """
-        squares = piece.squares()
-        for square in squares:
-            row, col = square
-            if row < 0 or col < 0 or row >= self.size or col >= self.size:
-                return True
-        return False
+        return self._mask_of(piece) is None
 
-    def any_collisions(self, piece: Piece) -> bool:
+    def any_collisions(self, piece: Move) -> bool:
         """
         Returns a boolean indicating whether or not the
         given piece (not yet played on the board) would
@@ -250,17 +388,13 @@ class Blokus(BlokusBase):
         Raises ValueError if the anchor of the piece
         is None.
         """
-        if not self.any_wall_collisions(piece):
-            piece._check_anchor()
-            locs = piece.squares()
-            for row, col in locs:
-                if self.grid[row][col] is not None:
-                    return True
-            return False
+        mask = self._mask_of(piece)
+        if mask is not None:
+            return mask & self._occupied != 0
         else:
             return True
 
-    def legal_to_place(self, piece: Piece) -> bool:
+    def legal_to_place(self, piece: Move) -> bool:
         """
         If the current player has not already played
         this shape, this method returns a boolean
@@ -280,42 +414,9 @@ class Blokus(BlokusBase):
         Raises ValueError if the anchor of the piece
         is None.
         """
+        return self._legal_mask(piece) is not None
 
-        if piece.shape.kind not in self.remaining_shapes(self._curr_player):
-            raise ValueError("The player has already played a piece with this shape.")
-
-        if piece.anchor is None:
-            raise ValueError("The anchor of the piece is None.")
-
-        if self.any_collisions(piece):
-            return False
-
-        valid = False
-        if self._num_moves < self.num_players - len(self.retired_players):
-            for square in piece.squares():
-                if square in self._start_positions:
-                    valid = True
-                    break
-            return valid
-
-        for r,c in piece.cardinal_neighbors():
-            if r < self.size and r >= 0 and c < self.size and c >= 0:
-                cell = self.grid[r][c]
-                if cell != None:
-                    if cell[0] == self.curr_player:
-                        return False
-
-        corner = False
-        for r,c in piece.intercardinal_neighbors():
-            if r < self.size and r >= 0 and c < self.size and c >= 0:
-                cell = self.grid[r][c]
-                if cell != None:
-                    if cell[0] == self.curr_player:
-                        corner = True
-                        break
-        return corner
-
-    def maybe_place(self, piece: Piece) -> bool:
+    def maybe_place(self, piece: Move) -> bool:
         """
         If the piece is legal to place, this method
         places the piece on the board, updates the
@@ -339,16 +440,45 @@ class Blokus(BlokusBase):
         if self._curr_player in self._retired_players:
             return False
 
-        if not self.legal_to_place(piece):
+        mask = self._legal_mask(piece)
+        if mask is None:
             return False
+        self._place(piece, mask)
+        return True
 
-        if piece.shape.kind not in self.remaining_shapes(self._curr_player):
-            raise ValueError
-
-        for r, c in piece.squares():
-            self._grid[r][c] = (self.curr_player, piece.shape.kind)
-
-        self._played_pieces.append((self.curr_player, piece.shape.kind))
+    def _place(self, piece: Move, mask: int) -> None:
+        """
+        Places a piece covering the squares of mask for the
+        current player, without checking that it is legal, and
+        moves on to the next player.
+        """
+        player = self._curr_player
+        self._history.append(_Undo(
+            player, piece.kind, mask, self._edge_masks[player],
+            self._corner_masks[player], tuple(self._frontier),
+            self._scores[player], False, self._hash))
+        self._remaining[player] &= ~SHAPE_BITS[piece.kind]
+        self._scores[player] += SHAPE_SIZES[piece.kind]
+        if not self._remaining[player]:
+            self._scores[player] += 20 if piece.kind == ShapeKind.ONE else 15
+        self._occupied |= mask
+        self._player_masks[player] |= mask
+        if isinstance(piece, Placement):
+            edge_mask, corner_mask = _neighbor_masks(
+                self._size, piece.kind, piece.orientation.index, piece.anchor)
+        else:
+            edge_mask = squares_mask(piece.cardinal_neighbors(), self._size)
+            corner_mask = squares_mask(piece.intercardinal_neighbors(),
+                                       self._size)
+        self._edge_masks[player] |= edge_mask
+        self._corner_masks[player] |= corner_mask
+        for other in range(1, self._num_players + 1):
+            self._frontier[other] &= ~mask
+        self._frontier[player] = self._corner_masks[player] & ~(
+            self._occupied | self._edge_masks[player])
+        self._grid = None
+
+        self._played_pieces.append((player, piece.kind, piece.squares()))
 
         self._curr_player = (self.curr_player % self.num_players) + 1
         self._num_moves += 1
@@ -359,7 +489,95 @@ class Blokus(BlokusBase):
         else:
             self._curr_player = (self._curr_player % self.num_players) + 1
 
-        return True
+        keys = self._zobrist
+        self._hash ^= (squares_hash(keys, player, mask)
+                       ^ keys.played[player][SHAPE_INDEX[piece.kind]]
+                       ^ keys.to_move[player]
+                       ^ keys.to_move[self._curr_player])
+        if not self._remaining[player] and piece.kind == ShapeKind.ONE:
+            self._hash ^= keys.one_bonus[player]
+
+    def replay(self, moves: Iterable[Optional[Move]], check: bool = False,
+               expected_hash: Optional[int] = None) -> None:
+        """
+        Plays a sequence of moves (Pieces or Placements, or None
+        for a retirement) from the current position, e.g., to
+        rebuild a recorded game or any position along the way.
+
+        The moves are trusted to be legal: unless check is True,
+        placements skip the legality checks of maybe_place and go
+        straight to updating the board. Instead, the Zobrist hash
+        of the final position can be compared to expected_hash.
+        The moves can be taken back with undo as usual.
+
+        Raises ValueError if check is True and a move is illegal
+        (the moves before it stay played), or if the final hash
+        differs from expected_hash.
+        """
+        for move in moves:
+            if move is None:
+                self.retire()
+            elif check:
+                if not self.maybe_place(move):
+                    raise ValueError(f"Illegal move: {move}")
+            else:
+                mask = self._mask_of(move)
+                if mask is None:
+                    raise ValueError(f"Move off the board: {move}")
+                self._place(move, mask)
+        if expected_hash is not None and self._hash != expected_hash:
+            raise ValueError("The replayed position does not match the "
+                             "expected hash.")
+
+    def _mask_of(self, piece: Move) -> Optional[int]:
+        """
+        Returns the mask of the squares covered by the piece,
+        or None if the piece would collide with a wall.
+
+        Raises ValueError if the anchor of the piece
+        is None.
+        """
+        size = self._size
+        if isinstance(piece, Placement):
+            orientation = piece.orientation
+            top = piece.anchor[0] - orientation.origin[0]
+            left = piece.anchor[1] - orientation.origin[1]
+            if (top < 0 or left < 0 or top + orientation.height > size
+                    or left + orientation.width > size):
+                return None
+            mask = self._orientation_masks[orientation.kind][orientation.index]
+            return mask << (top * size + left)
+
+        mask = 0
+        for r, c in piece.squares():
+            if r < 0 or c < 0 or r >= size or c >= size:
+                return None
+            mask |= 1 << (r * size + c)
+        return mask
+
+    def _legal_mask(self, piece: Move) -> Optional[int]:
+        """
+        Returns the mask of the squares covered by the piece if
+        it is legal for the current player to place it, and None
+        otherwise. See legal_to_place.
+        """
+        if not self._remaining[self._curr_player] & SHAPE_BITS[piece.kind]:
+            raise ValueError("The player has already played a piece with this shape.")
+
+        if piece.anchor is None:
+            raise ValueError("The anchor of the piece is None.")
+
+        mask = self._mask_of(piece)
+        if mask is None or mask & self._occupied:
+            return None
+
+        player = self._curr_player
+        if not self._player_masks[player]:
+            return mask if mask & self._start_mask else None
+
+        if mask & self._edge_masks[player]:
+            return None
+        return mask if mask & self._corner_masks[player] else None
 
     def retire(self) -> None:
         """
@@ -367,47 +585,69 @@ class Blokus(BlokusBase):
         may choose to retire. This player does not get any more
         turns; they are skipped over during subsequent gameplay.
         """
-        if self._curr_player not in self.retired_players:
+        retired = self._curr_player not in self.retired_players
+        self._history.append(_Undo(
+            self._curr_player, None, 0, 0, 0, (), 0, retired, self._hash))
+        keys = self._zobrist
+        self._hash ^= keys.to_move[self._curr_player]
+        if retired:
             self.retired_players.add(self._curr_player)
+            self._hash ^= keys.retired[self._curr_player]
 
         if len(self._retired_players) != self._num_players:
             while self._curr_player in self.retired_players:
                 self._curr_player = (self._curr_player % self.num_players) + 1
         else:
             self._curr_player = (self._curr_player % self.num_players) + 1
-
+        self._hash ^= keys.to_move[self._curr_player]
+
+    def undo(self) -> None:
+        """
+        Reverts the most recent successful maybe_place or retire,
+        restoring the board, the current player and all other game
+        state exactly. Together with maybe_place, this lets search
+        code explore moves without copying the game.
+
+        Raises ValueError if there is nothing to undo.
+        """
+        if not self._history:
+            raise ValueError("There is no move to undo.")
+
+        entry = self._history.pop()
+        self._curr_player = entry.player
+        self._hash = entry.hash
+        if entry.kind is None:
+            if entry.retired:
+                self._retired_players.discard(entry.player)
+            return
+
+        player = entry.player
+        self._remaining[player] |= SHAPE_BITS[entry.kind]
+        self._scores[player] = entry.score
+        self._occupied &= ~entry.mask
+        self._player_masks[player] &= ~entry.mask
+        self._edge_masks[player] = entry.edge_mask
+        self._corner_masks[player] = entry.corner_mask
+        self._frontier = list(entry.frontier)
+        self._played_pieces.pop()
+        self._num_moves -= 1
+        self._grid = None
 
     def get_score(self, player: int) -> int:
         """
         Returns the score for a given player. A player's score
         can be computed at any time during gameplay or at the
         completion of a game.
-        """
-        score = 0
-        pieces = self.remaining_shapes(player)
-        if len(pieces) != 0:
-            for piece in pieces:
-                if piece in definitions: #test consolidation if this works
-                    shape_definitions = definitions[piece].strip()
-                    shape_definitions = shape_definitions.replace(" ", "")
-                    shape_definitions = shape_definitions.replace("@", "")
-                    shape_definitions = ''.join(shape_definitions.splitlines())
-                    score -= len(shape_definitions)
-        else:
-            bonus = False
-            for x in range (-1, -(len(self._played_pieces)), -1):
-                played_piece = self._played_pieces[x]
-                if played_piece[0] == player:
-                    if played_piece[1] == ShapeKind.ONE:
-                        score += 20
-                        bonus = True
-                        break
-            if not bonus:
-                score += 15
 
-        return score
+        Scores are kept up to date by maybe_place: each player
+        starts at minus the total size of their shapes, gains the
+        size of each shape they play, and gains a bonus of 15
+        (20 if the last shape was ShapeKind.ONE) once all their
+        shapes are played.
+        """
+        return self._scores[player]
 
-    def available_moves(self) -> set[Piece]:
+    def available_moves(self, backend: str = "bitboard") -> set[Piece]:
         """
         Returns the set of all possible moves that the current
         player may make. As with the arguments to the maybe_place
@@ -417,26 +657,291 @@ class Blokus(BlokusBase):
         Notice there may be many different Pieces corresponding
         to a single Shape that are considered available moves
         (because they may differ in location and orientation).
-        """
-        possible_moves = set()
-        remaining_shapes = self.remaining_shapes(self.curr_player)
-
-        for r in range(self.size):
-            for c in range(self.size):
-                for shape_kind in remaining_shapes:
-                    shape = self.shapes[shape_kind]
-                    piece = Piece(shape)
-                    piece.set_anchor((r, c))
-
-                    if self.legal_to_place(piece):
-                        possible_moves.add(piece)
-        return possible_moves
 
-    def reset(self):
+        Search code should prefer legal_placements, which does
+        not build a Piece for every move.
+
+        With backend "numpy", the moves are computed for all
+        locations at once by numpy_moves instead of from the
+        bitboards (the result is the same).
+        """
+        if backend == "numpy":
+            import numpy_moves
+            return numpy_moves.available_moves(self)
+        if backend != "bitboard":
+            raise ValueError(f"Unknown move generation backend: {backend}")
+        return {placement.to_piece() for placement in self.legal_placements()}
+
+    def frontier_squares(self, player: int) -> list[Point]:
+        """
+        Returns the squares that the player's next piece could
+        cover to touch their played pieces at a corner: the empty
+        squares diagonal to those pieces that share no edge with
+        them. Before the player's first move, these are the free
+        start positions instead.
+        """
+        return list(mask_squares(self._frontier_mask(player), self._size))
+
+    def _frontier_mask(self, player: int) -> int:
+        """
+        Returns the mask of the player's frontier squares (see
+        frontier_squares).
+        """
+        if self._player_masks[player]:
+            return self._frontier[player]
+        return self._start_mask & ~self._occupied
+
+    def corner_count(self, player: int) -> int:
+        """
+        Returns the number of the player's frontier squares (see
+        frontier_squares): the corners their next piece could
+        start from. Frontiers are maintained by maybe_place and
+        undo, so this costs a single bit count.
+        """
+        return self._frontier_mask(player).bit_count()
+
+    def corner_mobility(self, player: int) -> dict[Point, int]:
+        """
+        Returns, for each of the player's frontier squares, the
+        number of legal placements (as if it were the player's
+        turn) that cover it.
+
+        Counts are cached per square and shape kind, together
+        with the occupied and edge squares within reach of the
+        square. A count is only recomputed once a piece is placed
+        (or undone) near its square, so between nearby moves this
+        costs a few lookups per frontier square.
+        """
+        size = self._size
+        return {divmod(bit, size): self._corner_placements(player, bit)
+                for bit in mask_bits(self._frontier_mask(player))}
+
+    def mobility(self, player: int) -> int:
+        """
+        Returns the sum of the player's corner_mobility counts.
+        This is an estimate of the number of legal placements of
+        the player: it is exact unless some placements cover more
+        than one frontier square (those are counted once for each),
+        so it is never less than len(legal_placements(player)).
+        """
+        return sum(self._corner_placements(player, bit)
+                   for bit in mask_bits(self._frontier_mask(player)))
+
+    def _corner_placements(self, player: int, bit: int) -> int:
+        """
+        Returns the number of legal placements of the player that
+        cover the frontier square with the given bit index, using
+        and updating the cache described in corner_mobility.
+        """
+        blocked = self._occupied | self._edge_masks[player]
+        nearby = blocked & _reach_masks(self._size)[bit]
+        cache = self._mobility[player]
+        entry = cache.get(bit)
+        if entry is None or entry[0] != nearby:
+            entry = cache[bit] = (nearby, {})
+        counts = entry[1]
+
+        size = self._size
+        target_r, target_c = divmod(bit, size)
+        total = 0
+        remaining = self._remaining[player]
+        for shape_kind, shape_bit in SHAPE_BITS.items():
+            if not remaining & shape_bit:
+                continue
+            count = counts.get(shape_kind)
+            if count is None:
+                count = 0
+                masks = self._orientation_masks[shape_kind]
+                for orientation in ORIENTATIONS[shape_kind]:
+                    mask = masks[orientation.index]
+                    height, width = orientation.height, orientation.width
+                    for dr, dc in orientation.offsets:
+                        top, left = target_r - dr, target_c - dc
+                        if (top < 0 or left < 0 or top + height > size
+                                or left + width > size):
+                            continue
+                        if not (mask << (top * size + left)) & blocked:
+                            count += 1
+                counts[shape_kind] = count
+            total += count
+        return total
+
+    def placeable_shapes(self, player: int) -> list[ShapeKind]:
+        """
+        Returns the player's remaining shapes that still fit
+        somewhere on the board without overlapping any piece or
+        sharing an edge with the player's own pieces. Corner
+        contact is not required, so a shape that is not returned
+        can never be played again.
+        """
+        size = self._size
+        blocked = self._occupied | self._edge_masks[player]
+        placeable = []
+        for shape_kind in self.remaining_shapes(player):
+            masks = self._orientation_masks[shape_kind]
+            if any((masks[orientation.index] << (top * size + left)) & blocked == 0
+                   for orientation in ORIENTATIONS[shape_kind]
+                   for top in range(size - orientation.height + 1)
+                   for left in range(size - orientation.width + 1)):
+                placeable.append(shape_kind)
+        return placeable
+
+    def legal_placements(self, player: Optional[int] = None) -> list[Placement]:
+        """
+        Returns all possible moves that the current player (or
+        the given player, as if it were their turn) may make, as
+        Placements (one per distinct orientation and location).
+
+        Moves are generated from the current player's frontier:
+        the empty squares diagonal to their played pieces that do
+        not share an edge with them (or, before their first move,
+        the free start positions). Every legal move must cover a
+        frontier square, so only placements covering one are tried.
+        """
+        placements = []
+        if player is None:
+            player = self._curr_player
+        size = self._size
+        targets = self.frontier_squares(player)
+        blocked = self._occupied | self._edge_masks[player]
+
+        for shape_kind in self.remaining_shapes(player):
+            masks = self._orientation_masks[shape_kind]
+            for orientation in ORIENTATIONS[shape_kind]:
+                mask = masks[orientation.index]
+                height, width = orientation.height, orientation.width
+                origin_r, origin_c = orientation.origin
+                tried = set()
+                for tr, tc in targets:
+                    for dr, dc in orientation.offsets:
+                        top, left = tr - dr, tc - dc
+                        if (top < 0 or left < 0 or top + height > size
+                                or left + width > size):
+                            continue
+                        shift = top * size + left
+                        if shift in tried:
+                            continue
+                        tried.add(shift)
+                        if (mask << shift) & blocked:
+                            continue
+                        placements.append(Placement(
+                            orientation, (top + origin_r, left + origin_c)))
+        return placements
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns a compact snapshot of the game state, which
+        from_bytes turns back into an equal game: a small header
+        (see SNAPSHOT_HEADER), the start positions, and CELL_BITS
+        bits per square for the player covering it. A classic
+        snapshot takes 173 bytes (15 for the header, 8 for the
+        start positions and 150 for the cells). The undo history
+        is not included.
+        """
+        size, num_players = self._size, self._num_players
+        retired = sum(1 << (p - 1) for p in self._retired_players)
+        # A player who has played every shape scores exactly their
+        # bonus, which is 20 only if their last shape was ONE.
+        last_one = sum(1 << (p - 1) for p in range(1, num_players + 1)
+                       if not self._remaining[p] and self._scores[p] == 20)
+
+        cells = 0
+        for player in range(1, num_players + 1):
+            for bit in mask_bits(self._player_masks[player]):
+                cells |= player << (CELL_BITS * bit)
+
+        starts = sorted(self._start_positions)
+        data = bytearray(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_VERSION, size, num_players, self._curr_player, retired,
+            last_one, self._zobrist_seed, len(starts)))
+        data += bytes(x for start in starts for x in start)
+        data += cells.to_bytes((CELL_BITS * size * size + 7) // 8, "little")
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Blokus":
+        """
+        Returns the game saved by to_bytes. Each player's pieces
+        are recovered from their squares, and the scores, masks
+        and Zobrist hash are recomputed from the pieces.
+
+        Raises ValueError if the data is not a valid snapshot.
+        """
+        try:
+            version, size, num_players, curr_player, retired, last_one, \
+                seed, count = SNAPSHOT_HEADER.unpack_from(data, 0)
+        except struct.error as error:
+            raise ValueError(f"Invalid snapshot: {error}")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        offset = SNAPSHOT_HEADER.size
+        flat = data[offset:offset + 2 * count]
+        offset += 2 * count
+        length = (CELL_BITS * size * size + 7) // 8
+        if len(flat) < 2 * count or len(data) < offset + length:
+            raise ValueError("Invalid snapshot: the data is too short")
+        if not 1 <= curr_player <= num_players:
+            raise ValueError("Invalid snapshot: no such current player")
+
+        game = cls(num_players, size, set(zip(flat[::2], flat[1::2])), seed)
+        cells = int.from_bytes(data[offset:offset + length], "little")
+        for bit in range(size * size):
+            player = (cells >> (CELL_BITS * bit)) & ((1 << CELL_BITS) - 1)
+            if player:
+                if player > num_players:
+                    raise ValueError("Invalid snapshot: no such player")
+                game._player_masks[player] |= 1 << bit
+
+        for player in range(1, num_players + 1):
+            for squares in _pieces(game._player_masks[player], size):
+                placement = Placement.from_squares(squares)
+                kind = placement.kind
+                if not game._remaining[player] & SHAPE_BITS[kind]:
+                    raise ValueError("Invalid snapshot: a shape is played twice")
+                game._remaining[player] &= ~SHAPE_BITS[kind]
+                game._scores[player] += SHAPE_SIZES[kind]
+                edge_mask, corner_mask = _neighbor_masks(
+                    size, kind, placement.orientation.index, placement.anchor)
+                game._edge_masks[player] |= edge_mask
+                game._corner_masks[player] |= corner_mask
+                game._played_pieces.append((player, kind, squares))
+            if not game._remaining[player]:
+                game._scores[player] += 20 if last_one >> (player - 1) & 1 else 15
+            game._occupied |= game._player_masks[player]
+
+        for player in range(1, num_players + 1):
+            game._frontier[player] = game._corner_masks[player] & ~(
+                game._occupied | game._edge_masks[player])
+        game._curr_player = curr_player
+        game._retired_players = {p for p in range(1, num_players + 1)
+                                 if retired >> (p - 1) & 1}
+        game._num_moves = len(game._played_pieces)
+        game._hash = position_hash(game._zobrist, game._player_masks,
+                                   game._remaining, curr_player,
+                                   game._retired_players,
+                                   [p for p in range(1, num_players + 1)
+                                    if not game._remaining[p]
+                                    and last_one >> (p - 1) & 1])
+        return game
+
+    def reset(self) -> None:
         """
         Resets the game state to start a new game.
         """
-        self._grid = [[None] * self._size for _ in range(self._size)]
+        self._grid = None
         self._curr_player = 1
         self._num_moves = 0
-        self._retired_players = set()
\ No newline at end of file
+        self._retired_players = set()
+        self._played_pieces = []
+        self._occupied = 0
+        self._player_masks = [0] * (self._num_players + 1)
+        self._edge_masks = [0] * (self._num_players + 1)
+        self._corner_masks = [0] * (self._num_players + 1)
+        self._frontier = [0] * (self._num_players + 1)
+        self._remaining = [ALL_SHAPES_MASK] * (self._num_players + 1)
+        self._scores = [-sum(SHAPE_SIZES.values())] * (self._num_players + 1)
+        self._history = []
+        self._mobility = [{} for _ in range(self._num_players + 1)]
+        self._hash = position_hash(self._zobrist, self._player_masks,
+                                   self._remaining, self._curr_player,
+                                   self._retired_players)
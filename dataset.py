@@ -0,0 +1,197 @@
+"""
+Board-state datasets as memory-mapped NumPy arrays.
+
+Exports the positions of logged games (see game_log.py) as fixed
+width arrays, one row per position: the position before each turn
+of each game. A dataset is a directory of shards; shard n holds
+one .npy file per array:
+
+    {n:06d}.planes.npy     uint8 (rows, players, size, size): 1
+                           where the player has a piece
+    {n:06d}.remaining.npy  uint32 (rows, players): the player's
+                           unplayed shapes as a bitmask (see
+                           Blokus.remaining_mask)
+    {n:06d}.to_move.npy    uint8 (rows,): the player to move
+    {n:06d}.move.npy       uint16 (rows,): the move played, as a
+                           game_record move code
+    {n:06d}.outcome.npy    int8 (rows, players): the final scores
+                           of the game
+
+Shards are written through np.lib.format.open_memmap, so exports
+stream with bounded memory, and load_shard opens them with
+mmap_mode="r" so they can be sliced without reading or copying
+them whole.
+
+Usage:
+
+    python dataset.py logs/ dataset/
+"""
+import os
+from typing import Iterable, Optional
+
+import click
+import numpy as np
+
+from game_log import read_games
+from game_record import GameRecord, encode_move
+
+ARRAYS = ("planes", "remaining", "to_move", "move", "outcome")
+
+
+def shard_path(directory: str, shard: int, name: str) -> str:
+    """
+    Returns the path of one array of a shard.
+    """
+    return os.path.join(directory, f"{shard:06d}.{name}.npy")
+
+
+def load_shard(directory: str, shard: int) -> dict[str, np.ndarray]:
+    """
+    Returns the arrays of a shard, memory-mapped read-only.
+    """
+    return {name: np.load(shard_path(directory, shard, name), mmap_mode="r")
+            for name in ARRAYS}
+
+
+def num_shards(directory: str) -> int:
+    """
+    Returns the number of shards of a dataset.
+    """
+    shards = 0
+    while os.path.exists(shard_path(directory, shards, ARRAYS[0])):
+        shards += 1
+    return shards
+
+
+class _ShardWriter:
+    """
+    Writes positions into memory-mapped shards of at most
+    shard_size rows.
+    """
+
+    def __init__(self, directory: str, shard_size: int, size: int,
+                 num_players: int) -> None:
+        """
+        Constructor
+        """
+        self.directory = directory
+        self.shard_size = shard_size
+        self.shapes = {
+            "planes": ((num_players, size, size), np.uint8),
+            "remaining": ((num_players,), np.uint32),
+            "to_move": ((), np.uint8),
+            "move": ((), np.uint16),
+            "outcome": ((num_players,), np.int8),
+        }
+        self.shard = num_shards(directory)
+        self.arrays: Optional[dict[str, np.memmap]] = None
+        self.rows = 0
+
+    def row(self) -> tuple[dict[str, np.memmap], int]:
+        """
+        Returns the arrays of the current shard and the index of
+        the next row to fill, starting a new shard if needed.
+        """
+        if self.arrays is None or self.rows == self.shard_size:
+            self.close()
+            self.arrays = {
+                name: np.lib.format.open_memmap(
+                    shard_path(self.directory, self.shard, name), mode="w+",
+                    dtype=dtype, shape=(self.shard_size, *shape))
+                for name, (shape, dtype) in self.shapes.items()
+            }
+            self.rows = 0
+        self.rows += 1
+        return self.arrays, self.rows - 1
+
+    def close(self) -> None:
+        """
+        Finishes the current shard. A partly filled shard is
+        rewritten with just its filled rows.
+        """
+        if self.arrays is None:
+            return
+        for name, array in self.arrays.items():
+            path = shard_path(self.directory, self.shard, name)
+            if self.rows < self.shard_size:
+                partial = path + ".tmp"
+                trimmed = np.lib.format.open_memmap(
+                    partial, mode="w+", dtype=array.dtype,
+                    shape=(self.rows, *array.shape[1:]))
+                trimmed[:] = array[:self.rows]
+                trimmed.flush()
+                del trimmed
+                os.replace(partial, path)
+            else:
+                array.flush()
+        self.arrays = None
+        self.shard += 1
+
+
+def export_dataset(records: Iterable[GameRecord], directory: str,
+                   shard_size: int = 1 << 16) -> int:
+    """
+    Appends the positions of the given games to the dataset in
+    directory (which is created if needed), in shards of at most
+    shard_size positions. Returns the number of positions written.
+
+    Moves are replayed without legality checks (see Blokus.replay),
+    and each game's final scores are checked against its record.
+
+    Raises ValueError if the games do not all have the same board
+    size and number of players, or if a game does not replay to
+    its recorded scores.
+    """
+    os.makedirs(directory, exist_ok=True)
+    writer: Optional[_ShardWriter] = None
+    dimensions = (0, 0)
+    positions = 0
+    try:
+        for record in records:
+            if writer is None:
+                writer = _ShardWriter(directory, shard_size, record.size,
+                                      record.num_players)
+                dimensions = (record.size, record.num_players)
+            elif (record.size, record.num_players) != dimensions:
+                raise ValueError("All games of a dataset must have the same "
+                                 "board size and number of players.")
+
+            game = record.new_game()
+            planes = np.zeros((record.num_players, record.size, record.size),
+                              dtype=np.uint8)
+            for move in record.moves:
+                arrays, row = writer.row()
+                arrays["planes"][row] = planes
+                arrays["remaining"][row] = [game.remaining_mask(p) for p in
+                                            range(1, record.num_players + 1)]
+                arrays["to_move"][row] = game.curr_player
+                arrays["move"][row] = encode_move(move, record.size)
+                arrays["outcome"][row] = record.scores
+                positions += 1
+
+                if move is not None:
+                    player = game.curr_player
+                    for r, c in move.squares():
+                        planes[player - 1, r, c] = 1
+                game.replay((move,))
+            record.check_scores(game)
+    finally:
+        if writer is not None:
+            writer.close()
+    return positions
+
+
+@click.command()
+@click.option('--shard-size', default = 1 << 16, type = int, help = 'Positions per shard')
+@click.argument('log')
+@click.argument('directory')
+def main(shard_size: int, log: str, directory: str) -> None:
+    """
+    Export the positions of the games in LOG to a dataset in DIRECTORY
+    """
+    positions = export_dataset(read_games(log), directory, shard_size)
+    print(f"wrote {positions} positions to {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Exact endgame solver for Blokus.
+
+Near the end of a game each player has few legal placements left,
+so the remaining game tree can be searched to the end. The solver
+returns the exact final score difference for the player to move
+(their score minus the best opponent's score) under best play, with
+opponents assumed to play against them ("paranoid" play, which is
+exact for two players), together with a move that achieves it.
+
+The search uses alpha-beta pruning, a memo of solved positions
+keyed by Blokus.zobrist_hash, and score bounds computed from the
+shapes each player can still fit on the board: shapes that fit
+nowhere are pruned from the bounds, since they can never be
+played again.
+
+EndgamePolicy hands a game over to the solver automatically once
+few enough legal placements remain.
+"""
+from dataclasses import dataclass
+import random
+import time
+from typing import NamedTuple, Optional
+
+from alphabeta import bound_decides, bound_flag, search_moves
+from blokus import SHAPE_SIZES, Blokus
+from mcts import TreeMove, tree_moves
+from orientations import Placement
+from shape_definitions import ShapeKind
+from simulate import Policy
+
+class _Memo(NamedTuple):
+    """
+    A solved position: its value, which is exact or a lower or
+    upper bound (flag, see alphabeta.EXACT), and the best move
+    found there.
+    """
+
+    value: int
+    flag: int
+    move: TreeMove
+
+
+class SolverLimit(Exception):
+    """
+    Raised when a solve exceeds the solver's node or time budget.
+    """
+
+
+@dataclass
+class Solution:
+    """
+    The result of a solve: the exact final score difference for
+    the player to move, a move achieving it (None if the player
+    must retire), and how much work the solve took.
+    """
+
+    value: int
+    move: TreeMove
+    nodes: int
+    elapsed: float
+
+
+class EndgameSolver:
+    """
+    Solves positions exactly. If max_nodes is set, a solve that
+    would visit more nodes raises SolverLimit instead, and so does
+    a solve that runs longer than time_limit seconds, if set.
+
+    The memo is kept between solves (it is keyed by position and
+    solving player), and is cleared once it holds memo_size
+    entries.
+    """
+
+    max_nodes: Optional[int]
+    memo_size: int
+    time_limit: Optional[float]
+    nodes: int
+    _memo: dict[tuple[int, int], _Memo]
+    _player: int
+    _placeable: dict[int, frozenset[ShapeKind]]
+    _deadline: float
+
+    def __init__(self, max_nodes: Optional[int] = None,
+                 memo_size: int = 2_000_000,
+                 time_limit: Optional[float] = None) -> None:
+        """
+        Constructor
+        """
+        self.max_nodes = max_nodes
+        self.memo_size = memo_size
+        self.time_limit = time_limit
+        self.nodes = 0
+        self._memo = {}
+        self._player = 0
+        self._placeable = {}
+        self._deadline = float("inf")
+
+    def solve(self, game: Blokus) -> Solution:
+        """
+        Solves the game's current position for the player to
+        move. The game is left in its original position.
+
+        Raises SolverLimit if the node or time budget is exceeded.
+        """
+        start = time.perf_counter()
+        self._deadline = (float("inf") if self.time_limit is None
+                          else start + self.time_limit)
+        self.nodes = 0
+        self._player = game.curr_player
+        if game.game_over:
+            return Solution(self._difference(game), None, 0, 0.0)
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+
+        # Shapes only ever stop fitting, so the shapes that fit now
+        # bound what each player can still play anywhere below.
+        self._placeable = {
+            p: frozenset(game.placeable_shapes(p))
+            for p in range(1, game.num_players + 1)
+            if p not in game.retired_players
+        }
+
+        value = self._search(game, -float("inf"), float("inf"))
+        memo = self._memo[(game.zobrist_hash, self._player)]
+        return Solution(int(value), memo.move, self.nodes,
+                        time.perf_counter() - start)
+
+    def _search(self, game: Blokus, alpha: float, beta: float) -> float:
+        """
+        Returns the final score difference of the game's position
+        for the solving player, within the window (alpha, beta).
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SolverLimit
+        # Each node generates every legal move, so checking the
+        # clock at every node costs little.
+        if time.perf_counter() > self._deadline:
+            raise SolverLimit
+
+        if game.game_over:
+            return self._difference(game)
+
+        low, high = self._bounds(game)
+        if high <= alpha:
+            return high
+        if low >= beta:
+            return low
+
+        key = (game.zobrist_hash, self._player)
+        memo = self._memo.get(key)
+        hint = None
+        if memo is not None:
+            hint = memo.move
+            if bound_decides(memo.value, memo.flag, alpha, beta):
+                return memo.value
+
+        best_value, best_move = search_moves(
+            game, self._order(tree_moves(game), hint),
+            game.curr_player == self._player, alpha, beta,
+            lambda a, b: self._search(game, a, b))
+        self._memo[key] = _Memo(int(best_value),
+                                bound_flag(best_value, alpha, beta), best_move)
+        return best_value
+
+    def _difference(self, game: Blokus) -> int:
+        """
+        Returns the solving player's score minus the best
+        opponent's score (or just their score, if they have
+        no opponents).
+        """
+        score = game.get_score(self._player)
+        others = [game.get_score(p) for p in range(1, game.num_players + 1)
+                  if p != self._player]
+        return score - max(others) if others else score
+
+    def _best_score(self, game: Blokus, player: int) -> int:
+        """
+        Returns the highest score the player could still reach,
+        playing every remaining shape that still fits.
+        """
+        score = game.get_score(player)
+        if player not in self._placeable or player in game.retired_players:
+            return score
+        remaining = game.remaining_shapes(player)
+        placeable = [kind for kind in remaining
+                     if kind in self._placeable[player]]
+        score += sum(SHAPE_SIZES[kind] for kind in placeable)
+        if remaining and len(placeable) == len(remaining):
+            score += 20 if ShapeKind.ONE in remaining else 15
+        return score
+
+    def _bounds(self, game: Blokus) -> tuple[int, int]:
+        """
+        Returns a lower and an upper bound on the final score
+        difference, given that scores never decrease.
+        """
+        player = self._player
+        score = game.get_score(player)
+        best = self._best_score(game, player)
+        others = [p for p in range(1, game.num_players + 1) if p != player]
+        if not others:
+            return score, best
+        return (score - max(self._best_score(game, p) for p in others),
+                best - max(game.get_score(p) for p in others))
+
+    def _order(self, moves: list[TreeMove], hint: TreeMove) -> list[TreeMove]:
+        """
+        Returns the moves with the memo's best move first, then
+        larger pieces first.
+        """
+        def key(move: TreeMove) -> tuple[bool, int]:
+            if move is None:
+                return (True, 0)
+            return (move != hint, -SHAPE_SIZES[move.kind])
+
+        return sorted(moves, key=key)
+
+
+class EndgamePolicy:
+    """
+    A simulate.Policy that plays like another (heuristic) policy
+    until at most threshold legal placements remain for all
+    active players combined, and then plays solved moves.
+
+    Each solve stops after time_limit seconds (and max_nodes
+    nodes, if set), so hard positions cannot blow the latency
+    budget: if a solve runs out, the heuristic policy moves
+    instead, and no solve is tried again until retry_after more
+    pieces have been placed. The most recent solution is kept in
+    last.
+    """
+
+    heuristic: Policy
+    threshold: int
+    retry_after: int
+    solver: EndgameSolver
+    last: Optional[Solution]
+    _failed_at: Optional[int]
+
+    def __init__(self, heuristic: Policy, threshold: int = 40,
+                 max_nodes: Optional[int] = None, time_limit: float = 0.5,
+                 retry_after: int = 4) -> None:
+        """
+        Constructor
+        """
+        self.heuristic = heuristic
+        self.threshold = threshold
+        self.retry_after = retry_after
+        self.solver = EndgameSolver(max_nodes, time_limit=time_limit)
+        self.last = None
+        self._failed_at = None
+
+    def __call__(self, game: Blokus, moves: list[Placement],
+                 rng: random.Random) -> Placement:
+        placed = sum(len(SHAPE_SIZES) - game.remaining_mask(p).bit_count()
+                     for p in range(1, game.num_players + 1))
+        failed = self._failed_at
+        if failed is not None and failed <= placed < failed + self.retry_after:
+            return self.heuristic(game, moves, rng)
+
+        remaining = len(moves)
+        for player in range(1, game.num_players + 1):
+            if remaining > self.threshold:
+                break
+            if player != game.curr_player and player not in game.retired_players:
+                remaining += len(game.legal_placements(player))
+
+        if remaining <= self.threshold:
+            try:
+                self.last = self.solver.solve(game)
+            except SolverLimit:
+                self.last = None
+                self._failed_at = placed
+            else:
+                if self.last.move is not None:
+                    return self.last.move
+        return self.heuristic(game, moves, rng)
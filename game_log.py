@@ -0,0 +1,243 @@
+"""
+Streaming game logs.
+
+A log is a directory of append-only shard files holding game
+records (see game_record.py). Writers never modify an existing
+shard: each writer starts a new one, and moves on to another once
+shard_size games have been written. Readers go through the shards
+lazily, one record at a time, so a log of any size is read in
+constant memory.
+
+Shard layout:
+
+    header:  magic b"BKGL", format version (u8), flags (u8;
+             COMPRESSED if the rest of the file is a zlib stream)
+    records: length of the record (u32, little-endian), then the
+             record itself
+
+Writers flush every flush_every games (with compression, as a
+zlib sync point), so a reader sees all but the most recent games
+of a log that is still being written.
+
+Usage:
+
+    python game_log.py --game classic-4 --games 100000 --compress logs/
+"""
+import os
+import struct
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional
+import zlib
+
+import click
+
+from game_record import GameRecord
+from presets import PRESETS
+from selfplay import run_selfplay
+from simulate import GameResult
+
+MAGIC = b"BKGL"
+VERSION = 1
+COMPRESSED = 1
+HEADER = struct.Struct("<4sBB")
+LENGTH = struct.Struct("<I")
+SUFFIX = ".bklog"
+
+# Bytes read from a shard at a time.
+_CHUNK_SIZE = 1 << 16
+
+
+def shard_paths(directory: str) -> list[str]:
+    """
+    Returns the paths of the shards of a log, in order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.endswith(SUFFIX)]
+
+
+class GameLogWriter:
+    """
+    Appends game records to a log directory (which is created if
+    needed). Use as a context manager, or call close when done.
+    """
+
+    directory: str
+    shard_size: int
+    flush_every: int
+    compress: bool
+    games: int
+    _file: Optional[BinaryIO]
+    _compressor: Optional["zlib._Compress"]
+    _shard_games: int
+    _next_shard: int
+
+    def __init__(self, directory: str, shard_size: int = 100_000,
+                 flush_every: int = 1000, compress: bool = False) -> None:
+        """
+        Constructor
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_size = shard_size
+        self.flush_every = flush_every
+        self.compress = compress
+        self.games = 0
+        self._file = None
+        self._compressor = None
+        self._shard_games = 0
+        existing = shard_paths(directory)
+        self._next_shard = (int(os.path.basename(existing[-1])[:-len(SUFFIX)]) + 1
+                            if existing else 0)
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def write(self, record: GameRecord) -> None:
+        """
+        Appends a game record to the log.
+        """
+        if self._file is None or self._shard_games >= self.shard_size:
+            self._open_shard()
+        assert self._file is not None
+        data = record.to_bytes()
+        data = LENGTH.pack(len(data)) + data
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._file.write(data)
+        self._shard_games += 1
+        self.games += 1
+        if self.games % self.flush_every == 0:
+            self.flush()
+
+    def write_results(self, results: Iterable[GameResult]) -> None:
+        """
+        Appends the records of simulated games (e.g., from
+        selfplay.run_selfplay) to the log as they arrive.
+        """
+        for result in results:
+            self.write(GameRecord.from_result(result))
+
+    def flush(self) -> None:
+        """
+        Writes all games so far through to the current shard.
+        """
+        if self._file is None:
+            return
+        if self._compressor is not None:
+            self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Finishes the current shard.
+        """
+        if self._file is None:
+            return
+        if self._compressor is not None:
+            self._file.write(self._compressor.flush())
+        self._file.close()
+        self._file = None
+        self._compressor = None
+
+    def _open_shard(self) -> None:
+        """
+        Finishes the current shard, if any, and starts the next.
+        """
+        self.close()
+        path = os.path.join(self.directory,
+                            f"{self._next_shard:06d}{SUFFIX}")
+        self._next_shard += 1
+        self._file = open(path, "xb")
+        self._file.write(HEADER.pack(MAGIC, VERSION,
+                                     COMPRESSED if self.compress else 0))
+        if self.compress:
+            self._compressor = zlib.compressobj()
+        self._shard_games = 0
+
+
+def _shard_bytes(path: str) -> Iterator[bytes]:
+    """
+    Yields the (decompressed) contents of a shard after its
+    header, a chunk at a time.
+
+    Raises ValueError if the file is not a shard.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a game log shard")
+        magic, version, flags = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a game log shard")
+
+        decompressor = zlib.decompressobj() if flags & COMPRESSED else None
+        while True:
+            chunk = file.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            yield chunk
+
+
+def read_shard(path: str) -> Iterator[GameRecord]:
+    """
+    Yields the game records of one shard, in order. A record cut
+    short at the end of the shard (one still being written) is
+    skipped.
+    """
+    buffer = b""
+    for chunk in _shard_bytes(path):
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buffer, offset)
+            end = offset + LENGTH.size + length
+            if end > len(buffer):
+                break
+            yield GameRecord.from_bytes(buffer[offset + LENGTH.size:end])
+            offset = end
+        buffer = buffer[offset:]
+
+
+def read_games(directory: str) -> Iterator[GameRecord]:
+    """
+    Yields the game records of a log, shard by shard, in the
+    order they were written. Call GameRecord.replay on a record
+    to get the final position as a Blokus game.
+    """
+    for path in shard_paths(directory):
+        yield from read_shard(path)
+
+
+@click.command()
+@click.option('--game', default = 'classic-4', type = click.Choice(list(PRESETS), case_sensitive = False), help = 'Preset to play')
+@click.option('-g', '--games', default = 10000, type = int, help = 'Number of self-play games')
+@click.option('--seed', default = 0, type = int, help = 'Seed of the first game')
+@click.option('-w', '--workers', default = None, type = int, help = 'Worker processes (default: one per CPU)')
+@click.option('--shard-size', default = 100_000, type = int, help = 'Games per shard')
+@click.option('--compress', is_flag = True, help = 'Compress shards with zlib')
+@click.argument('directory')
+def main(game: str, games: int, seed: int, workers: Optional[int],
+         shard_size: int, compress: bool, directory: str) -> None:
+    """
+    Append random self-play games to the log in DIRECTORY
+    """
+    start = time.perf_counter()
+    with GameLogWriter(directory, shard_size, compress=compress) as writer:
+        writer.write_results(run_selfplay(game.lower(), games, seed,
+                                          workers=workers))
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in shard_paths(directory))
+    print(f"wrote {games} games in {elapsed:.1f}s; "
+          f"log is {size} bytes in {len(shard_paths(directory))} shards")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Compact binary game records.
+
+Each turn of a game is packed into two bytes (a big-endian u16):
+the orientation number of the placed piece (see
+orientations.orientation_number, 7 bits) and the index of the top
+left square of its bounding box (row * size + column, 9 bits), or
+RETIRE (0xFFFF) when the player retired. A complete classic game
+fits in under 200 bytes.
+
+Record layout (little-endian except for the moves):
+
+    header:  format version (u8), preset (u8, its position in
+             presets.PRESETS, or CUSTOM), board size (u8), number
+             of players (u8), seed (u64)
+    starts:  for CUSTOM games only: number of start positions (u8),
+             then the row and column of each (2 x u8)
+    result:  final score of each player (i8 each)
+    moves:   number of turns (u16), then the code of each turn
+"""
+from dataclasses import dataclass
+import struct
+from typing import Optional
+
+from blokus import Blokus
+from orientations import ALL_ORIENTATIONS, Move, Placement, orientation_number
+from piece import Point
+from presets import PRESETS
+from simulate import GameResult
+
+VERSION = 1
+CUSTOM = 255
+RETIRE = 0xFFFF
+HEADER = struct.Struct("<BBBBQ")
+MOVE_COUNT = struct.Struct("<H")
+
+_PRESET_NAMES = list(PRESETS)
+
+# The square index of a move code takes its low 9 bits.
+_SQUARE_BITS = 9
+
+
+def encode_move(move: Optional[Move], size: int) -> int:
+    """
+    Returns the code of a move (a Piece or Placement, or None for
+    a retirement) on a board of the given size.
+
+    Raises ValueError if the board is too large to encode, or if
+    the anchor of the piece is None.
+    """
+    if size * size > 1 << _SQUARE_BITS:
+        raise ValueError(f"Boards of size {size} are too large to encode.")
+    if move is None:
+        return RETIRE
+    if not isinstance(move, Placement):
+        move = Placement.from_piece(move)
+    orientation = move.orientation
+    top = move.anchor[0] - orientation.origin[0]
+    left = move.anchor[1] - orientation.origin[1]
+    return (orientation_number(orientation) << _SQUARE_BITS) | (top * size + left)
+
+
+def decode_move(code: int, size: int) -> Optional[Placement]:
+    """
+    Returns the move (None for a retirement) with the given code
+    on a board of the given size.
+    """
+    if code == RETIRE:
+        return None
+    orientation = ALL_ORIENTATIONS[code >> _SQUARE_BITS]
+    top, left = divmod(code & ((1 << _SQUARE_BITS) - 1), size)
+    return Placement(orientation, (top + orientation.origin[0],
+                                   left + orientation.origin[1]))
+
+
+@dataclass
+class GameRecord:
+    """
+    A finished (or partial) game: its variant, the seed it was
+    played with, the final scores and every turn in order (the
+    placement made, or None when the player retired). preset is
+    None for games that do not use one of presets.PRESETS.
+    """
+
+    preset: Optional[str]
+    size: int
+    num_players: int
+    start_positions: frozenset[Point]
+    seed: int
+    scores: list[int]
+    moves: list[Optional[Placement]]
+
+    @classmethod
+    def from_result(cls, result: GameResult) -> "GameRecord":
+        """
+        Returns the record of a simulated game.
+        """
+        preset = PRESETS[result.preset]
+        return cls(result.preset, preset.size, preset.num_players,
+                   preset.start_positions, result.seed, list(result.scores),
+                   list(result.moves))
+
+    def new_game(self) -> Blokus:
+        """
+        Returns a new game of the record's variant.
+        """
+        return Blokus(self.num_players, self.size, set(self.start_positions))
+
+    def replay(self, plies: Optional[int] = None, check: bool = False) -> Blokus:
+        """
+        Returns a game of the record's variant with its first
+        plies moves (all of them by default) played.
+
+        The moves are trusted (see Blokus.replay) unless check is
+        True. A full replay is checked against the recorded scores
+        instead.
+
+        Raises ValueError if check is True and a move is illegal,
+        or if the scores of a full replay differ from the record's.
+        """
+        game = self.new_game()
+        game.replay(self.moves[:plies], check)
+        if plies is None or plies >= len(self.moves):
+            self.check_scores(game)
+        return game
+
+    def check_scores(self, game: Blokus) -> None:
+        """
+        Raises ValueError if the scores of the game differ from
+        the recorded scores.
+        """
+        scores = [game.get_score(p) for p in range(1, self.num_players + 1)]
+        if scores != self.scores:
+            raise ValueError(f"Replayed scores {scores} differ from the "
+                             f"recorded scores {self.scores}")
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the binary encoding of the record.
+
+        Raises ValueError if the record does not fit the format.
+        """
+        variant = CUSTOM
+        if self.preset is not None:
+            variant = _PRESET_NAMES.index(self.preset)
+        try:
+            data = bytearray(HEADER.pack(VERSION, variant, self.size,
+                                         self.num_players, self.seed))
+            if variant == CUSTOM:
+                starts = sorted(self.start_positions)
+                data += struct.pack(f"<B{2 * len(starts)}B", len(starts),
+                                    *(x for start in starts for x in start))
+            data += struct.pack(f"<{self.num_players}b", *self.scores)
+            data += MOVE_COUNT.pack(len(self.moves))
+            data += struct.pack(f">{len(self.moves)}H",
+                                *(encode_move(move, self.size)
+                                  for move in self.moves))
+        except struct.error as error:
+            raise ValueError(f"The record does not fit the format: {error}")
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameRecord":
+        """
+        Decodes a record produced by to_bytes.
+
+        Raises ValueError if the data is not a valid record.
+        """
+        try:
+            version, variant, size, num_players, seed = \
+                HEADER.unpack_from(data, 0)
+            if version != VERSION:
+                raise ValueError(f"Unsupported record version {version}")
+            offset = HEADER.size
+            preset: Optional[str] = None
+            if variant == CUSTOM:
+                count = data[offset]
+                flat = struct.unpack_from(f"<{2 * count}B", data, offset + 1)
+                starts = frozenset(zip(flat[::2], flat[1::2]))
+                offset += 1 + 2 * count
+            else:
+                preset = _PRESET_NAMES[variant]
+                starts = PRESETS[preset].start_positions
+            scores = list(struct.unpack_from(f"<{num_players}b", data, offset))
+            offset += num_players
+            (count,) = MOVE_COUNT.unpack_from(data, offset)
+            codes = struct.unpack_from(f">{count}H", data,
+                                       offset + MOVE_COUNT.size)
+        except (struct.error, IndexError) as error:
+            raise ValueError(f"Invalid game record: {error}")
+        return cls(preset, size, num_players, starts, seed, scores,
+                   [decode_move(code, size) for code in codes])
@@ -0,0 +1,333 @@
+"""
+Monte Carlo Tree Search (UCT) bot for Blokus.
+
+The bot explores moves with Blokus.maybe_place/retire and takes
+them back with Blokus.undo, so a search never copies the game. Leaf
+positions are evaluated with fast random playouts, and each node
+keeps a reward vector with one entry per player, so the same code
+plays games of 1 to 4 players.
+
+Searches are bounded by wall-clock time, by a number of iterations,
+or both. The subtree under the chosen move is kept and reused on
+the bot's next turn when the game reaches one of its positions.
+"""
+from collections import deque
+import math
+import random
+import time
+from typing import Optional
+
+from blokus import SHAPE_SIZES, Blokus
+from orientations import ORIENTATIONS, Placement
+
+# A move in the tree: a placement, or None when the player to move
+# has no legal placement and must retire.
+TreeMove = Optional[Placement]
+
+
+class Node:
+    """
+    A node of the search tree: the position reached by playing
+    move, made by player, from the parent's position.
+
+    rewards holds the sum of the playout rewards of each player
+    (index 0 is player 1) over the node's visits. untried is None
+    until the node's moves are generated.
+    """
+
+    __slots__ = ("move", "player", "parent", "hash", "children", "untried",
+                 "visits", "rewards")
+
+    move: TreeMove
+    player: int
+    parent: Optional["Node"]
+    hash: int
+    children: list["Node"]
+    untried: Optional[list[TreeMove]]
+    visits: int
+    rewards: list[float]
+
+    def __init__(self, move: TreeMove, player: int, parent: Optional["Node"],
+                 position_hash: int, num_players: int) -> None:
+        """
+        Constructor
+        """
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.hash = position_hash
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.rewards = [0.0] * num_players
+
+
+def reward_vector(game: Blokus) -> list[float]:
+    """
+    Returns the reward of each player for the current scores of
+    the game (see score_rewards).
+    """
+    return score_rewards(
+        [game.get_score(p) for p in range(1, game.num_players + 1)])
+
+
+def score_rewards(scores: list[int]) -> list[float]:
+    """
+    Returns a reward in [0, 1] for each player, derived from
+    their scores: the fraction of opponents the player is ahead
+    of, counting ties as half. In a one-player game, the reward is
+    the player's score scaled to [0, 1].
+    """
+    if len(scores) == 1:
+        lowest = -sum(SHAPE_SIZES.values())
+        return [(scores[0] - lowest) / (20 - lowest)]
+
+    rewards = []
+    for i, mine in enumerate(scores):
+        ahead = sum(1.0 if mine > theirs else 0.5 if mine == theirs else 0.0
+                    for j, theirs in enumerate(scores) if j != i)
+        rewards.append(ahead / (len(scores) - 1))
+    return rewards
+
+
+def _subtree_size(node: Node) -> int:
+    """
+    Returns the number of nodes in the subtree rooted at node.
+    """
+    size = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        size += 1
+        stack.extend(current.children)
+    return size
+
+
+def play(game: Blokus, move: TreeMove) -> None:
+    """
+    Plays a tree move (which must be legal) on the game.
+    """
+    if move is None:
+        game.retire()
+    elif not game.maybe_place(move):
+        raise ValueError(f"Illegal move: {move}")
+
+
+def tree_moves(game: Blokus) -> list[TreeMove]:
+    """
+    Returns the moves available to the current player: their
+    legal placements, or a single retirement if there are none.
+    """
+    moves: list[TreeMove] = list(game.legal_placements())
+    return moves if moves else [None]
+
+
+def random_move(game: Blokus, rng: random.Random, attempts: int = 24) -> TreeMove:
+    """
+    Quickly picks a random legal move for the current player.
+
+    Rather than generating every legal move, this tries a few
+    random placements that cover a random frontier square, and
+    only falls back to full generation if none of them is legal.
+    Moves are therefore not drawn uniformly, which is fine for
+    playouts.
+    """
+    player = game.curr_player
+    frontier = game.frontier_squares(player)
+    kinds = game.remaining_shapes(player)
+    if not frontier or not kinds:
+        return None
+
+    for _ in range(attempts):
+        target_r, target_c = rng.choice(frontier)
+        orientation = rng.choice(ORIENTATIONS[rng.choice(kinds)])
+        r, c = rng.choice(orientation.squares)
+        placement = Placement(orientation, (target_r - r, target_c - c))
+        if game.legal_to_place(placement):
+            return placement
+
+    moves = game.legal_placements()
+    return rng.choice(moves) if moves else None
+
+
+def rollout(game: Blokus, rng: random.Random) -> list[float]:
+    """
+    Plays random moves until the game is over, and returns the
+    reward vector of the final position. The game is restored to
+    its original position before returning.
+    """
+    plies = 0
+    while not game.game_over:
+        play(game, random_move(game, rng))
+        plies += 1
+    rewards = reward_vector(game)
+    for _ in range(plies):
+        game.undo()
+    return rewards
+
+
+class MCTSBot:
+    """
+    A UCT player. An instance is a simulate.Policy, and keeps
+    its search tree between calls so it can reuse the subtree of
+    the position it is asked about next.
+
+    Each search stops after time_limit seconds or max_iterations
+    iterations, whichever comes first (either may be None, but
+    not both). max_nodes bounds the size of the tree: once it is
+    reached, searches keep running playouts but stop expanding.
+    nodes counts the nodes of the current tree (a reused subtree
+    is recounted at the start of each search).
+    """
+
+    time_limit: Optional[float]
+    max_iterations: Optional[int]
+    max_nodes: int
+    exploration: float
+    root: Optional[Node]
+    nodes: int
+    iterations: int
+    elapsed: float
+
+    def __init__(self, time_limit: Optional[float] = 1.0,
+                 max_iterations: Optional[int] = None,
+                 max_nodes: int = 1_000_000,
+                 exploration: float = math.sqrt(2)) -> None:
+        """
+        Constructor
+        """
+        if time_limit is None and max_iterations is None:
+            raise ValueError("MCTSBot needs a time or iteration budget")
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.root = None
+        self.nodes = 0
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        """
+        Returns the number of search iterations per second during
+        the most recent search. Each iteration walks one path of
+        the tree, adds at most one node and runs one playout.
+        """
+        return self.iterations / self.elapsed if self.elapsed else 0.0
+
+    def __call__(self, game: Blokus, moves: list[Placement],
+                 rng: random.Random) -> Placement:
+        """
+        Searches from the current position of the game, and
+        returns the most visited of the given legal moves.
+        """
+        root = self._reuse_root(game)
+        if root is None:
+            root = Node(None, 0, None, game.zobrist_hash, game.num_players)
+            root.untried = list(moves)
+            self.nodes = 1
+        else:
+            self.nodes = _subtree_size(root)
+        self.root = root
+
+        clock = time.perf_counter
+        start = clock()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        self.iterations = 0
+        while True:
+            self._iterate(game, root, rng)
+            self.iterations += 1
+            if (self.max_iterations is not None
+                    and self.iterations >= self.max_iterations):
+                break
+            if deadline is not None and clock() >= deadline:
+                break
+        self.elapsed = clock() - start
+
+        if not root.children:
+            # The tree was too full to expand the root at all.
+            self.root = None
+            return rng.choice(moves)
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None
+        self.root = best
+        assert best.move is not None
+        return best.move
+
+    def _reuse_root(self, game: Blokus) -> Optional[Node]:
+        """
+        Returns the node of the previous tree for the game's
+        current position, if any, detached from its parent.
+        Only the few plies since the bot's previous move are
+        searched.
+        """
+        if self.root is None:
+            return None
+
+        target = game.zobrist_hash
+        queue = deque([(self.root, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if node.hash == target:
+                node.parent = None
+                return node
+            if depth < game.num_players:
+                queue.extend((child, depth + 1) for child in node.children)
+        return None
+
+    def _iterate(self, game: Blokus, root: Node, rng: random.Random) -> None:
+        """
+        Runs one selection, expansion, playout and
+        backpropagation step.
+        """
+        node = root
+        depth = 0
+
+        # Selection
+        while node.untried == [] and node.children:
+            node = self._select(node)
+            play(game, node.move)
+            depth += 1
+
+        # Expansion
+        if not game.game_over:
+            if node.untried is None:
+                node.untried = tree_moves(game)
+            if node.untried and self.nodes < self.max_nodes:
+                move = node.untried.pop(rng.randrange(len(node.untried)))
+                player = game.curr_player
+                play(game, move)
+                depth += 1
+                child = Node(move, player, node, game.zobrist_hash,
+                             game.num_players)
+                node.children.append(child)
+                self.nodes += 1
+                node = child
+
+        # Playout
+        rewards = rollout(game, rng)
+        for _ in range(depth):
+            game.undo()
+
+        # Backpropagation
+        current: Optional[Node] = node
+        while current is not None:
+            current.visits += 1
+            for i, reward in enumerate(rewards):
+                current.rewards[i] += reward
+            current = current.parent
+
+    def _select(self, node: Node) -> Node:
+        """
+        Returns the child of a fully expanded node with the
+        highest upper confidence bound for its mover.
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+
+        def ucb(child: Node) -> float:
+            mean = child.rewards[child.player - 1] / child.visits
+            return mean + exploration * math.sqrt(log_visits / child.visits)
+
+        return max(node.children, key=ucb)
@@ -0,0 +1,118 @@
+"""
+NumPy move generation for Blokus.
+
+Instead of testing placements one anchor at a time, this computes
+the legality of every orientation at every position on the board
+at once. The board is turned into two boolean planes for the
+player to move:
+
+    blocked:  squares a piece may not cover (occupied squares, and
+              empty squares sharing an edge with the player's own
+              pieces, found by dilating them cardinally)
+    frontier: empty squares diagonal to the player's pieces that
+              are not blocked (found by dilating them diagonally),
+              or the free start positions before their first move
+
+An orientation fits at a top-left position if none of its squares
+is blocked, and is legal there if one of them is on the frontier.
+Both are correlations of the orientation's squares with a plane,
+computed for all orientations together by gathering from sliding
+5x5 windows of the planes (every orientation fits in a 5x5 box).
+"""
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from blokus import Blokus
+from orientations import (ALL_ORIENTATIONS, ORIENTATIONS, Placement,
+                          orientation_number)
+from piece import Piece
+
+# Every orientation fits in a BOX x BOX bounding box.
+BOX = 5
+
+# Rows and columns of the squares of each orientation (numbered as
+# in ALL_ORIENTATIONS), relative to its top-left corner. Smaller
+# orientations repeat their first square, which changes neither
+# test.
+_ROWS = np.array([[o.offsets[min(i, len(o.offsets) - 1)][0]
+                   for i in range(BOX)] for o in ALL_ORIENTATIONS])
+_COLS = np.array([[o.offsets[min(i, len(o.offsets) - 1)][1]
+                   for i in range(BOX)] for o in ALL_ORIENTATIONS])
+
+# Orientation numbers of each shape kind.
+_NUMBERS = {
+    kind: [orientation_number(o) for o in orientations]
+    for kind, orientations in ORIENTATIONS.items()
+}
+
+
+def _dilate(plane: np.ndarray, offsets: list[tuple[int, int]]) -> np.ndarray:
+    """
+    Returns the squares at one of the given offsets from a square
+    of the plane.
+    """
+    size = plane.shape[0]
+    padded = np.pad(plane, 1)
+    result = np.zeros_like(plane)
+    for dr, dc in offsets:
+        result |= padded[1 - dr:1 - dr + size, 1 - dc:1 - dc + size]
+    return result
+
+
+def _planes(game: Blokus, player: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the blocked and frontier planes of the player.
+    """
+    owners = np.array([[0 if cell is None else cell[0] for cell in row]
+                       for row in game.grid], dtype=np.int8)
+    occupied = owners != 0
+    own = owners == player
+    blocked = occupied | _dilate(own, [(-1, 0), (1, 0), (0, -1), (0, 1)])
+    if own.any():
+        frontier = _dilate(own, [(-1, -1), (-1, 1), (1, -1), (1, 1)])
+        frontier &= ~blocked
+    else:
+        frontier = np.zeros_like(occupied)
+        for r, c in game.start_positions:
+            frontier[r, c] = not occupied[r, c]
+    return blocked, frontier
+
+
+def legal_placements(game: Blokus, player: Optional[int] = None) -> list[Placement]:
+    """
+    Returns the same moves as Blokus.legal_placements, for the
+    current player (or the given player, as if it were their
+    turn), though not necessarily in the same order.
+    """
+    if player is None:
+        player = game.curr_player
+    numbers = [number for kind in game.remaining_shapes(player)
+               for number in _NUMBERS[kind]]
+    if not numbers:
+        return []
+    blocked, frontier = _planes(game, player)
+
+    # Pad the planes so every window starting on the board is
+    # complete; squares off the board are blocked.
+    blocked = np.pad(blocked, (0, BOX - 1), constant_values=True)
+    frontier = np.pad(frontier, (0, BOX - 1))
+    rows, cols = _ROWS[numbers], _COLS[numbers]
+    fits = ~sliding_window_view(blocked, (BOX, BOX))[:, :, rows, cols].any(-1)
+    touches = sliding_window_view(frontier, (BOX, BOX))[:, :, rows, cols].any(-1)
+
+    placements = []
+    for top, left, i in zip(*np.nonzero(fits & touches)):
+        orientation = ALL_ORIENTATIONS[numbers[i]]
+        origin_r, origin_c = orientation.origin
+        placements.append(Placement(
+            orientation, (int(top) + origin_r, int(left) + origin_c)))
+    return placements
+
+
+def available_moves(game: Blokus) -> set[Piece]:
+    """
+    Returns the same moves as Blokus.available_moves.
+    """
+    return {placement.to_piece() for placement in legal_placements(game)}
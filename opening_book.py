@@ -0,0 +1,245 @@
+"""
+Opening books stored as memory-mapped binary files.
+
+A book maps the Zobrist hash (see zobrist.py, default seed) of each
+position reached during the first few plies of a preset to visit
+and win statistics and to the best continuation found.
+
+Books are built from self-play games. For every position within
+the first `plies` turns, the builder counts its visits, sums each
+seat's reward (see mcts.score_rewards), and picks as best move the
+continuation whose games gave the mover the highest mean reward.
+
+File layout (little-endian):
+
+    header:  magic b"BKOB", version (u16), board size (u8),
+             number of players (u8), plies (u16), padding (u16),
+             number of records (u32)
+    records: sorted by hash, each RECORD.size bytes: hash (u64),
+             visits (u32), per-seat reward sums (4 x f32),
+             best move orientation number (u8, 255 if none),
+             best move anchor row and column (2 x u8), padding
+
+Lookups binary-search the records in place, so opening a book
+costs one mmap call regardless of its size.
+
+Usage:
+
+    python opening_book.py --game duo --plies 4 --games 20000 duo.book
+"""
+from dataclasses import dataclass
+import mmap
+import random
+import struct
+from typing import Iterable, Optional
+
+import click
+
+from blokus import Blokus
+from mcts import score_rewards
+from orientations import ALL_ORIENTATIONS, Placement, orientation_number
+from presets import PRESETS, new_game
+from selfplay import run_selfplay
+from simulate import GameResult, Policy, random_policy
+
+MAGIC = b"BKOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBHHI")
+RECORD = struct.Struct("<QI4fBBBx")
+NO_MOVE = 255
+
+
+@dataclass
+class BookEntry:
+    """
+    Statistics for one book position. rewards holds the sum of
+    each seat's reward over the visits (index 0 is player 1).
+    """
+
+    visits: int
+    rewards: list[float]
+    best_move: Optional[Placement]
+
+    def mean_reward(self, player: int) -> float:
+        """
+        Returns the player's mean reward from this position.
+        """
+        return self.rewards[player - 1] / self.visits if self.visits else 0.0
+
+
+class OpeningBook:
+    """
+    A read-only, memory-mapped opening book file.
+    """
+
+    size: int
+    num_players: int
+    plies: int
+    count: int
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens the book file at path.
+
+        Raises ValueError if the file is not an opening book.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.num_players, self.plies, _, \
+            self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an opening book")
+
+    def close(self) -> None:
+        """
+        Unmaps the book file.
+        """
+        self._map.close()
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, position_hash: int) -> Optional[BookEntry]:
+        """
+        Returns the entry for the position with the given hash,
+        or None if the position is not in the book.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key = struct.unpack_from("<Q", self._map,
+                                     HEADER.size + middle * RECORD.size)[0]
+            if key < position_hash:
+                low = middle + 1
+            elif key > position_hash:
+                high = middle
+            else:
+                return self._entry(middle)
+        return None
+
+    def _entry(self, index: int) -> BookEntry:
+        """
+        Decodes the record at the given index.
+        """
+        _, visits, *rewards, number, r, c = RECORD.unpack_from(
+            self._map, HEADER.size + index * RECORD.size)
+        move = None
+        if number != NO_MOVE:
+            move = Placement(ALL_ORIENTATIONS[number], (r, c))
+        return BookEntry(visits, rewards[:self.num_players], move)
+
+    def best_move(self, game: Blokus) -> Optional[Placement]:
+        """
+        Returns the book move for the game's current position, if
+        the game matches the book and the move is legal.
+        """
+        if game.size != self.size or game.num_players != self.num_players:
+            return None
+        entry = self.lookup(game.zobrist_hash)
+        if entry is None or entry.best_move is None:
+            return None
+        if not game.legal_to_place(entry.best_move):
+            return None
+        return entry.best_move
+
+
+class BookPolicy:
+    """
+    A simulate.Policy that plays book moves while the game is in
+    the book, and defers to another policy afterwards.
+    """
+
+    def __init__(self, path: str, fallback: Policy = random_policy) -> None:
+        """
+        Constructor
+        """
+        self.book = OpeningBook(path)
+        self.fallback = fallback
+
+    def __call__(self, game: Blokus, moves: list[Placement],
+                 rng: random.Random) -> Placement:
+        move = self.book.best_move(game)
+        if move is not None:
+            return move
+        return self.fallback(game, moves, rng)
+
+
+def build_book(preset: str, results: Iterable[GameResult], plies: int,
+               path: str, min_visits: int = 2) -> int:
+    """
+    Writes an opening book for the named preset, covering the
+    first plies turns of the given games, to path. A continuation
+    must have been played at least min_visits times to be chosen
+    as best move. Returns the number of positions written.
+    """
+    num_players = PRESETS[preset].num_players
+    visits: dict[int, int] = {}
+    rewards: dict[int, list[float]] = {}
+    continuations: dict[int, dict[Placement, list[float]]] = {}
+
+    for result in results:
+        outcome = score_rewards(result.scores)
+        game = new_game(preset)
+        for move in result.moves[:plies]:
+            key = game.zobrist_hash
+            visits[key] = visits.get(key, 0) + 1
+            totals = rewards.setdefault(key, [0.0] * num_players)
+            for i, reward in enumerate(outcome):
+                totals[i] += reward
+            if move is None:
+                game.retire()
+                continue
+            stats = continuations.setdefault(key, {}).setdefault(
+                move, [0, 0.0])
+            stats[0] += 1
+            stats[1] += outcome[game.curr_player - 1]
+            game.maybe_place(move)
+
+    records = bytearray()
+    for key in sorted(visits):
+        best: Optional[Placement] = None
+        best_mean = -1.0
+        for move, (count, total) in continuations.get(key, {}).items():
+            if count >= min_visits and total / count > best_mean:
+                best, best_mean = move, total / count
+        totals = rewards[key] + [0.0] * (4 - num_players)
+        if best is None:
+            encoded = (NO_MOVE, 0, 0)
+        else:
+            encoded = (orientation_number(best.orientation), *best.anchor)
+        records += RECORD.pack(key, visits[key], *totals, *encoded)
+
+    size = PRESETS[preset].size
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, size, num_players, plies, 0,
+                               len(visits)))
+        file.write(records)
+    return len(visits)
+
+
+@click.command()
+@click.option('--game', default = 'duo', type = click.Choice(list(PRESETS), case_sensitive = False), help = 'Preset of the book')
+@click.option('--plies', default = 4, type = int, help = 'Number of opening turns to cover')
+@click.option('-g', '--games', default = 10000, type = int, help = 'Number of self-play games')
+@click.option('--seed', default = 0, type = int, help = 'Seed of the first game')
+@click.option('-w', '--workers', default = None, type = int, help = 'Worker processes (default: one per CPU)')
+@click.argument('path')
+def main(game: str, plies: int, games: int, seed: int,
+         workers: Optional[int], path: str) -> None:
+    """
+    Build an opening book from random self-play games
+    """
+    preset = game.lower()
+    count = build_book(preset, run_selfplay(preset, games, seed,
+                                            workers=workers), plies, path)
+    print(f"wrote {count} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Precomputed orientations of the 21 Blokus shapes.
+
+Every distinct orientation (flip plus rotation) of every ShapeKind
+is computed once, at import time, from the string representations
+in shape_definitions.py. Orientations that cover the same squares
+(e.g., all rotations of ShapeKind.X) are deduplicated, so
+iterating over ORIENTATIONS[kind] visits each placement footprint
+of that kind exactly once.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Union
+
+from piece import SHAPES, Piece, Point, Shape, neighbor_offsets
+from shape_definitions import ShapeKind
+
+
+@dataclass(frozen=True, slots=True)
+class Orientation:
+    """
+    One orientation of a shape.
+
+    squares, cardinal and intercardinal are relative to the
+    shape's origin, like the squares of a Piece, so a Piece
+    anchored at (r, c) covers (r + dr, c + dc) for each (dr, dc)
+    in squares. offsets holds the same squares translated so
+    that the bounding box starts at (0, 0); origin is where the
+    shape's origin lies in that frame.
+
+    face_up and rotation are Piece constructor arguments that
+    produce this orientation.
+    """
+
+    kind: ShapeKind
+    index: int
+    face_up: bool
+    rotation: int
+    squares: tuple[Point, ...]
+    offsets: tuple[Point, ...]
+    origin: Point
+    height: int
+    width: int
+    cardinal: tuple[Point, ...]
+    intercardinal: tuple[Point, ...]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle by reference into ORIENTATIONS, so unpickled
+        # orientations are the shared instances.
+        return (_lookup_orientation, (self.kind, self.index))
+
+
+def _lookup_orientation(kind: ShapeKind, index: int) -> Orientation:
+    """
+    Returns the orientation with the given kind and index.
+    """
+    return ORIENTATIONS[kind][index]
+
+
+def _orientations_of(shape: Shape) -> tuple[Orientation, ...]:
+    """
+    Returns the distinct orientations of a shape, in the order
+    they are first produced by flipping and then rotating it
+    right, as the Piece constructor does.
+    """
+    orientations: list[Orientation] = []
+    seen: set[tuple[Point, ...]] = set()
+
+    for face_up in (True, False):
+        for rotation in range(4):
+            squares = list(shape.squares)
+            if shape.can_be_transformed:
+                if not face_up:
+                    squares = [(r, -c) for r, c in squares]
+                for _ in range(rotation):
+                    squares = [(c, -r) for r, c in squares]
+
+            min_r = min(r for r, _ in squares)
+            min_c = min(c for _, c in squares)
+            offsets = tuple(sorted((r - min_r, c - min_c) for r, c in squares))
+            if offsets in seen:
+                continue
+            seen.add(offsets)
+
+            cardinal, intercardinal = neighbor_offsets(tuple(squares))
+            orientations.append(
+                Orientation(
+                    kind=shape.kind,
+                    index=len(orientations),
+                    face_up=face_up,
+                    rotation=rotation,
+                    squares=tuple(squares),
+                    offsets=offsets,
+                    origin=(-min_r, -min_c),
+                    height=max(r for r, _ in offsets) + 1,
+                    width=max(c for _, c in offsets) + 1,
+                    cardinal=cardinal,
+                    intercardinal=intercardinal,
+                )
+            )
+    return tuple(orientations)
+
+
+ORIENTATIONS: Mapping[ShapeKind, tuple[Orientation, ...]] = MappingProxyType(
+    {
+        kind: _orientations_of(SHAPES[kind])
+        for kind in ShapeKind
+    }
+)
+
+# Every orientation of every shape, in ShapeKind order. The position
+# of an orientation in this tuple identifies it compactly, e.g. in
+# files (see orientation_number).
+ALL_ORIENTATIONS: tuple[Orientation, ...] = tuple(
+    orientation for kind in ShapeKind for orientation in ORIENTATIONS[kind]
+)
+
+_ORIENTATION_NUMBERS: dict[tuple[ShapeKind, int], int] = {
+    (orientation.kind, orientation.index): number
+    for number, orientation in enumerate(ALL_ORIENTATIONS)
+}
+
+
+# Every orientation of every shape covers a different footprint.
+_BY_OFFSETS: dict[tuple[Point, ...], Orientation] = {
+    orientation.offsets: orientation for orientation in ALL_ORIENTATIONS
+}
+
+
+def orientation_number(orientation: Orientation) -> int:
+    """
+    Returns the position of the orientation in ALL_ORIENTATIONS.
+    """
+    return _ORIENTATION_NUMBERS[(orientation.kind, orientation.index)]
+
+
+class Placement:
+    """
+    A lightweight move: a shared, immutable Orientation plus the
+    anchor of its origin on the board.
+
+    Blokus methods accept a Placement wherever they accept a
+    Piece. Unlike a Piece, a Placement cannot be transformed in
+    place and does not own a copy of its shape, so it is cheap to
+    create and can be hashed and compared.
+    """
+
+    __slots__ = ("orientation", "anchor")
+
+    orientation: Orientation
+    anchor: Point
+
+    def __init__(self, orientation: Orientation, anchor: Point) -> None:
+        """
+        Constructor
+        """
+        self.orientation = orientation
+        self.anchor = anchor
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Placement):
+            return NotImplemented
+        return (self.orientation is other.orientation
+                and self.anchor == other.anchor)
+
+    def __hash__(self) -> int:
+        return hash((self.orientation.kind, self.orientation.index, self.anchor))
+
+    def __repr__(self) -> str:
+        return (f"Placement({self.orientation.kind}, "
+                f"{self.orientation.index}, {self.anchor})")
+
+    @property
+    def kind(self) -> ShapeKind:
+        """
+        Returns the kind of the placed shape.
+        """
+        return self.orientation.kind
+
+    def squares(self) -> list[Point]:
+        """
+        Returns the list of points covered by the placement.
+        """
+        anchor_r, anchor_c = self.anchor
+        return [(anchor_r + r, anchor_c + c) for r, c in self.orientation.squares]
+
+    def cardinal_neighbors(self) -> set[Point]:
+        """
+        Returns the combined cardinal neighbors of the
+        placement's squares.
+        """
+        anchor_r, anchor_c = self.anchor
+        return {(anchor_r + r, anchor_c + c) for r, c in self.orientation.cardinal}
+
+    def intercardinal_neighbors(self) -> set[Point]:
+        """
+        Returns the combined intercardinal neighbors of the
+        placement's squares, excluding cardinal neighbors.
+        """
+        anchor_r, anchor_c = self.anchor
+        return {
+            (anchor_r + r, anchor_c + c)
+            for r, c in self.orientation.intercardinal
+        }
+
+    @staticmethod
+    def from_piece(piece: Piece) -> "Placement":
+        """
+        Returns the Placement covering the same squares as an
+        anchored Piece.
+
+        Raises ValueError if the anchor of the piece is None.
+        """
+        if piece.anchor is None:
+            raise ValueError("The anchor of the piece is None.")
+        return Placement.from_squares(piece.squares())
+
+    @staticmethod
+    def from_squares(squares: Iterable[Point]) -> "Placement":
+        """
+        Returns the Placement covering exactly the given squares
+        (no two shapes have orientations with the same footprint).
+
+        Raises ValueError if the squares do not form a shape.
+        """
+        squares = list(squares)
+        if not squares:
+            raise ValueError("No squares to place.")
+        top = min(r for r, _ in squares)
+        left = min(c for _, c in squares)
+        offsets = tuple(sorted((r - top, c - left) for r, c in squares))
+        orientation = _BY_OFFSETS.get(offsets)
+        if orientation is None:
+            raise ValueError(f"The squares {squares} do not form a shape.")
+        return Placement(orientation, (top + orientation.origin[0],
+                                       left + orientation.origin[1]))
+
+    def to_piece(self) -> Piece:
+        """
+        Returns an equivalent, anchored Piece.
+        """
+        piece = Piece(SHAPES[self.orientation.kind], self.orientation.face_up,
+                      self.orientation.rotation)
+        piece.set_anchor(self.anchor)
+        return piece
+
+
+# A move is either a Piece or a Placement.
+Move = Union[Piece, Placement]
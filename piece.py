@@ -3,11 +3,12 @@ Blokus shapes and pieces.
 
 Modify only the methods marked as TODO.
 """
-import copy
 import textwrap
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
-from shape_definitions import ShapeKind
+from shape_definitions import ShapeKind, definitions
 
 # A point is represented by row and column numbers (r, c). The
 # top-left corner of a grid is (0, 0). Note that rows/columns
@@ -29,6 +30,36 @@ def col(point: Point) -> int:
     return point[1]
 
 
+CARDINAL_OFFSETS: tuple[Point, ...] = ((-1, 0), (0, 1), (1, 0), (0, -1))
+INTERCARDINAL_OFFSETS: tuple[Point, ...] = ((-1, -1), (-1, 1), (1, 1), (1, -1))
+
+
+@lru_cache(maxsize=1024)
+def neighbor_offsets(
+    squares: tuple[Point, ...]
+) -> tuple[tuple[Point, ...], tuple[Point, ...]]:
+    """
+    Returns the cardinal and intercardinal neighbor offsets of
+    the given squares, excluding the squares themselves and (for
+    intercardinal neighbors) any cardinal neighbors.
+
+    Results are cached, so each orientation of a shape is only
+    processed once.
+    """
+    own = set(squares)
+    cardinal = {
+        (r + dr, c + dc)
+        for r, c in squares
+        for dr, dc in CARDINAL_OFFSETS
+    } - own
+    intercardinal = {
+        (r + dr, c + dc)
+        for r, c in squares
+        for dr, dc in INTERCARDINAL_OFFSETS
+    } - own - cardinal
+    return tuple(sorted(cardinal)), tuple(sorted(intercardinal))
+
+
 class Shape:
     """
     Representing the 21 Blokus shapes, as named and defined by
@@ -152,6 +183,40 @@ class Shape:
                 self.squares[int]= new_point
 
 
+class FrozenShape(Shape):
+    """
+    A read-only Shape, whose squares are stored as a tuple.
+
+    The parsed shapes in SHAPES are frozen, since they are
+    shared by every game in the process. Pieces transform
+    their own mutable copy instead.
+    """
+
+    def __init__(self, shape: Shape) -> None:
+        """
+        Constructor
+        """
+        object.__setattr__(self, "kind", shape.kind)
+        object.__setattr__(self, "origin", shape.origin)
+        object.__setattr__(self, "can_be_transformed", shape.can_be_transformed)
+        object.__setattr__(self, "squares", tuple(shape.squares))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Shape {self.kind} is read-only")
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "FrozenShape":
+        return self
+
+
+# The 21 shapes, parsed once from shape_definitions.py.
+SHAPES: Mapping[ShapeKind, Shape] = MappingProxyType(
+    {
+        kind: FrozenShape(Shape.from_string(kind, definition))
+        for kind, definition in definitions.items()
+    }
+)
+
+
 class Piece:
     """
     A Piece takes a Shape and orients it on the board.
@@ -162,17 +227,23 @@ class Piece:
     orientations directly (for example, using two attributes
     called face_up: bool and rotation: int), we modify
     the shape attribute in place. Therefore, it is important
-    that each Piece object has its own deep copy of a
+    that each Piece object has its own copy of a
     Shape, so that transforming one Piece does not affect
     other Pieces that have the same Shape.
+
+    Move generation and search use the lighter-weight
+    orientations.Placement instead, which shares a precomputed
+    orientation rather than owning a Shape.
     """
 
+    __slots__ = ("shape", "anchor")
+
     shape: Shape
     anchor: Optional[Point]
 
     def __init__(self, shape: Shape, face_up: bool = True, rotation: int = 0):
         """
-        Each Piece will get its own deep copy of the given shape
+        Each Piece will get its own copy of the given shape
         subject to initial transformations according to the arguments:
 
             face_up:  If true, the initial Shape will be flipped
@@ -181,8 +252,9 @@ class Piece:
                       times the shape should be right-rotated by
                       90 degrees.
         """
-        # Deep copy shape, so that it can be transformed in place
-        self.shape = copy.deepcopy(shape)
+        # Copy shape, so that it can be transformed in place
+        self.shape = Shape(shape.kind, shape.origin,
+                           shape.can_be_transformed, list(shape.squares))
 
         # The anchor will be set by set_anchor
         self.anchor = None
@@ -195,6 +267,22 @@ class Piece:
         for _ in range(rotation % 4):
             self.shape.rotate_right()
 
+    @property
+    def kind(self) -> ShapeKind:
+        """
+        Returns the kind of the piece's shape.
+        """
+        return self.shape.kind
+
+    def copy(self) -> "Piece":
+        """
+        Returns a copy of the piece, with its own copy of
+        the (possibly transformed) shape and the same anchor.
+        """
+        piece = Piece(self.shape)
+        piece.anchor = self.anchor
+        return piece
+
     def set_anchor(self, anchor: Point) -> None:
         """
         Set the anchor point.
@@ -258,16 +346,9 @@ class Piece:
         self._check_anchor()
         assert self.anchor is not None
 
-        cardinal_positions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-        neighbors = set()
-        sqs = self.shape.squares
-
-        for square in self.squares():
-            for position in cardinal_positions:
-                neighbor = (square[0] + position[0], square[1] + position[1])
-                if neighbor not in self.squares():
-                    neighbors.add(neighbor)
-        return neighbors
+        anchor_r, anchor_c = self.anchor
+        cardinal, _ = neighbor_offsets(tuple(self.shape.squares))
+        return {(anchor_r + r, anchor_c + c) for r, c in cardinal}
 
     def intercardinal_neighbors(self) -> set[Point]:
         """
@@ -280,15 +361,6 @@ class Piece:
         self._check_anchor()
         assert self.anchor is not None
 
-        intercardinal_positions = [(-1, -1), (-1, 1), (1, 1), (1, -1)]
-
-        neighbors = set()
-
-        for square in self.squares():
-            for position in intercardinal_positions:
-                neighbor = (row(square) + position[0], 
-                            col(square) + position[1])
-                if (neighbor not in self.cardinal_neighbors() and
-                    neighbor not in self.squares()):
-                        neighbors.add(neighbor)
-        return neighbors
\ No newline at end of file
+        anchor_r, anchor_c = self.anchor
+        _, intercardinal = neighbor_offsets(tuple(self.shape.squares))
+        return {(anchor_r + r, anchor_c + c) for r, c in intercardinal}
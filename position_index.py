@@ -0,0 +1,258 @@
+"""
+An on-disk index of opening positions, stored with SQLite.
+
+For every position reached during the first few turns of the
+indexed games, the index keeps how often it was reached, how often
+each seat went on to win (ties count as a win for every tied
+player), and the same statistics for every continuation played
+from it. Positions are keyed by preset and Blokus.zobrist_hash
+(default seed); positions that are equal up to a symmetry of the
+board are not merged.
+
+Both tables are clustered on their keys (WITHOUT ROWID), so an
+explorer query is a single index range scan. Games are added in
+batches: each batch is aggregated in memory and written in one
+transaction.
+
+Usage:
+
+    python position_index.py --plies 16 logs/ openings.db
+"""
+from dataclasses import dataclass
+import sqlite3
+import time
+from typing import Iterable, Optional
+
+import click
+
+from blokus import Blokus
+from game_log import read_games
+from game_record import GameRecord, decode_move, encode_move
+from orientations import Placement
+from presets import PRESETS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    preset INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    visits INTEGER NOT NULL,
+    wins1 INTEGER NOT NULL,
+    wins2 INTEGER NOT NULL,
+    wins3 INTEGER NOT NULL,
+    wins4 INTEGER NOT NULL,
+    PRIMARY KEY (preset, hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS continuations (
+    preset INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    visits INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    PRIMARY KEY (preset, hash, move)
+) WITHOUT ROWID;
+"""
+
+_PRESET_NAMES = list(PRESETS)
+
+
+def _key(position_hash: int) -> int:
+    """
+    Returns the 64-bit hash as a signed integer, as SQLite
+    stores integers.
+    """
+    return position_hash - (1 << 64) if position_hash >= 1 << 63 else position_hash
+
+
+@dataclass
+class PositionStats:
+    """
+    Statistics of a position: visits, and wins of each seat
+    (index 0 is player 1).
+    """
+
+    visits: int
+    wins: list[int]
+
+
+@dataclass
+class MoveStats:
+    """
+    Statistics of a continuation: how often it was played, and
+    how often the player who played it went on to win.
+    """
+
+    move: Optional[Placement]
+    visits: int
+    wins: int
+
+    @property
+    def win_rate(self) -> float:
+        """
+        Returns the fraction of games the mover won.
+        """
+        return self.wins / self.visits if self.visits else 0.0
+
+
+class PositionIndex:
+    """
+    A position index in the SQLite database at path (created if
+    needed). Use as a context manager, or call close when done.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor
+        """
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        self._db.close()
+
+    def __enter__(self) -> "PositionIndex":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def add_games(self, records: Iterable[GameRecord], plies: int = 16,
+                  batch_size: int = 10_000) -> int:
+        """
+        Adds the positions of the first plies turns of each game
+        to the index, writing one transaction per batch_size games.
+        Returns the number of games added.
+
+        Raises ValueError if a game is not of one of the presets.
+        """
+        positions: dict[tuple[int, int], list[int]] = {}
+        moves: dict[tuple[int, int, int], list[int]] = {}
+        games = 0
+        for record in records:
+            if record.preset is None:
+                raise ValueError("Only games of a preset can be indexed.")
+            preset = _PRESET_NAMES.index(record.preset)
+            best = max(record.scores)
+            won = [score == best for score in record.scores]
+
+            game = record.new_game()
+            for move in record.moves[:plies]:
+                key = (preset, _key(game.zobrist_hash))
+                stats = positions.get(key)
+                if stats is None:
+                    stats = positions[key] = [0] * 5
+                stats[0] += 1
+                for seat, seat_won in enumerate(won, 1):
+                    stats[seat] += seat_won
+                move_key = (*key, encode_move(move, record.size))
+                move_stats = moves.get(move_key)
+                if move_stats is None:
+                    move_stats = moves[move_key] = [0, 0]
+                move_stats[0] += 1
+                move_stats[1] += won[game.curr_player - 1]
+                game.replay((move,))
+
+            games += 1
+            if games % batch_size == 0:
+                self._write(positions, moves)
+        self._write(positions, moves)
+        return games
+
+    def _write(self, positions: dict[tuple[int, int], list[int]],
+               moves: dict[tuple[int, int, int], list[int]]) -> None:
+        """
+        Adds aggregated statistics to the database in one
+        transaction, and clears them.
+        """
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET visits = visits + excluded.visits, "
+                "wins1 = wins1 + excluded.wins1, "
+                "wins2 = wins2 + excluded.wins2, "
+                "wins3 = wins3 + excluded.wins3, "
+                "wins4 = wins4 + excluded.wins4",
+                ((*key, *stats) for key, stats in positions.items()))
+            self._db.executemany(
+                "INSERT INTO continuations VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET visits = visits + excluded.visits, "
+                "wins = wins + excluded.wins",
+                ((*key, *stats) for key, stats in moves.items()))
+        positions.clear()
+        moves.clear()
+
+    def _preset_key(self, game: Blokus) -> Optional[tuple[int, int]]:
+        """
+        Returns the key of the game's current position, or None if
+        the game is not of one of the presets.
+        """
+        for number, preset in enumerate(PRESETS.values()):
+            if (game.size == preset.size
+                    and game.num_players == preset.num_players
+                    and game.start_positions == preset.start_positions):
+                return number, _key(game.zobrist_hash)
+        return None
+
+    def lookup(self, game: Blokus) -> Optional[PositionStats]:
+        """
+        Returns the statistics of the game's current position, or
+        None if it is not in the index.
+        """
+        key = self._preset_key(game)
+        if key is None:
+            return None
+        row = self._db.execute(
+            "SELECT visits, wins1, wins2, wins3, wins4 FROM positions "
+            "WHERE preset = ? AND hash = ?", key).fetchone()
+        if row is None:
+            return None
+        return PositionStats(row[0], list(row[1:1 + game.num_players]))
+
+    def continuations(self, game: Blokus, limit: Optional[int] = None) -> list[MoveStats]:
+        """
+        Returns the statistics of the continuations played from
+        the game's current position, most played first.
+        """
+        key = self._preset_key(game)
+        if key is None:
+            return []
+        rows = self._db.execute(
+            "SELECT move, visits, wins FROM continuations "
+            "WHERE preset = ? AND hash = ? ORDER BY visits DESC LIMIT ?",
+            (*key, -1 if limit is None else limit))
+        return [MoveStats(decode_move(move, game.size), visits, wins)
+                for move, visits, wins in rows]
+
+    def best_move(self, game: Blokus, min_visits: int = 10) -> Optional[Placement]:
+        """
+        Returns the continuation from the game's current position
+        with the best win rate among those played at least
+        min_visits times, if any.
+        """
+        candidates = [stats for stats in self.continuations(game)
+                      if stats.visits >= min_visits and stats.move is not None]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda stats: stats.win_rate).move
+
+
+@click.command()
+@click.option('--plies', default = 16, type = int, help = 'Number of opening turns to index')
+@click.option('--batch-size', default = 10_000, type = int, help = 'Games per transaction')
+@click.argument('log')
+@click.argument('path')
+def main(plies: int, batch_size: int, log: str, path: str) -> None:
+    """
+    Add the openings of the games in LOG to the index at PATH
+    """
+    start = time.perf_counter()
+    with PositionIndex(path) as index:
+        games = index.add_games(read_games(log), plies, batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {games} games in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Standard Blokus game variants.
+
+These are the presets offered by the --game option of the TUI
+and of the headless tools (simulate.py, selfplay.py, ...).
+"""
+from typing import NamedTuple
+
+from blokus import Blokus
+from piece import Point
+
+
+class Preset(NamedTuple):
+    """
+    Board size, number of players and start positions of a
+    game variant.
+    """
+
+    size: int
+    num_players: int
+    start_positions: frozenset[Point]
+
+
+CLASSIC_STARTS = frozenset({(0, 0), (0, 19), (19, 0), (19, 19)})
+
+PRESETS: dict[str, Preset] = {
+    "mono": Preset(11, 1, frozenset({(5, 5)})),
+    "duo": Preset(14, 2, frozenset({(4, 4), (9, 9)})),
+    "classic-2": Preset(20, 2, CLASSIC_STARTS),
+    "classic-3": Preset(20, 3, CLASSIC_STARTS),
+    "classic-4": Preset(20, 4, CLASSIC_STARTS),
+}
+
+
+def new_game(name: str) -> Blokus:
+    """
+    Returns a new game of the named preset.
+
+    Raises KeyError if there is no such preset.
+    """
+    preset = PRESETS[name]
+    return Blokus(preset.num_players, preset.size,
+                  set(preset.start_positions))
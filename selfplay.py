@@ -0,0 +1,99 @@
+"""
+Multiprocess self-play.
+
+Spreads simulated games (see simulate.py) across a pool of worker
+processes. Game i of a run is always played with seed + i, no
+matter which worker plays it, so runs are reproducible for any
+number of workers. Results are yielded as batches of games finish.
+
+Usage:
+
+    python selfplay.py --game duo --games 10000 --workers 32
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import time
+from typing import Iterator, Optional
+
+import click
+
+from presets import PRESETS
+from simulate import GameResult, Policy, play_game, random_policy
+
+# Each worker process keeps its own copy of the policy, set up
+# once by _init_worker rather than sent along with every batch.
+_worker_policy: Policy = random_policy
+
+
+def _init_worker(policy: Policy) -> None:
+    """
+    Stores the policy for the games played by this worker.
+    """
+    global _worker_policy
+    _worker_policy = policy
+
+
+def _play_batch(preset: str, seeds: range) -> list[GameResult]:
+    """
+    Plays one game for each seed, in this worker process.
+    """
+    return [play_game(preset, seed, _worker_policy) for seed in seeds]
+
+
+def run_selfplay(
+    preset: str,
+    games: int,
+    seed: int = 0,
+    policy: Policy = random_policy,
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+) -> Iterator[GameResult]:
+    """
+    Plays the given number of games of the named preset on a pool
+    of worker processes (one per CPU by default), and yields their
+    results in the order they finish.
+
+    The policy must be picklable (e.g., a module-level function
+    or an instance of a module-level class). Games are handed to
+    workers in batches of batch_size to keep overhead low.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = [range(start, min(start + batch_size, seed + games))
+               for start in range(seed, seed + games, batch_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(policy,)) as pool:
+        futures = [pool.submit(_play_batch, preset, seeds)
+                   for seeds in batches]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+@click.command()
+@click.option('--game', default = 'classic-4', type = click.Choice(list(PRESETS), case_sensitive = False), help = 'Preset to play')
+@click.option('-g', '--games', default = 1000, type = int, help = 'Number of games')
+@click.option('--seed', default = 0, type = int, help = 'Seed of the first game')
+@click.option('-w', '--workers', default = None, type = int, help = 'Worker processes (default: one per CPU)')
+def main(game: str, games: int, seed: int, workers: Optional[int]) -> None:
+    """
+    Play random self-play games on all cores and report throughput
+    """
+    preset = game.lower()
+    wins = [0] * PRESETS[preset].num_players
+    moves = 0
+    start = time.perf_counter()
+    for result in run_selfplay(preset, games, seed, workers=workers):
+        moves += result.num_moves
+        for winner in result.winners:
+            wins[winner - 1] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"games: {games}  moves: {moves}  time: {elapsed:.3f}s")
+    print(f"games/sec: {games / elapsed:.2f}  moves/sec: {moves / elapsed:.1f}")
+    for player, count in enumerate(wins, 1):
+        print(f"  player {player} won or tied {count} games")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Headless Blokus simulation.
+
+Plays complete games without a screen, choosing every move with a
+policy (uniformly random by default) and retiring players who have
+no legal move. Reports throughput and where the time was spent.
+
+Usage:
+
+    python simulate.py --game classic-4 --games 100 --seed 7
+"""
+from dataclasses import dataclass
+import random
+import time
+from typing import Callable, Optional
+
+import click
+
+from blokus import Blokus
+from orientations import Placement
+from presets import PRESETS, new_game
+
+# A policy chooses one of the (non-empty) list of legal moves for
+# the current player of a game. It may use the game to look ahead,
+# but must leave it as it found it.
+Policy = Callable[[Blokus, list[Placement], random.Random], Placement]
+
+
+def random_policy(game: Blokus, moves: list[Placement],
+                  rng: random.Random) -> Placement:
+    """
+    Chooses a legal move uniformly at random.
+    """
+    return rng.choice(moves)
+
+
+@dataclass
+class GameResult:
+    """
+    The outcome of one simulated game. moves holds each turn in
+    order: the placement made, or None when the player retired.
+    """
+
+    preset: str
+    seed: int
+    winners: list[int]
+    scores: list[int]
+    moves: list[Optional[Placement]]
+    duration: float
+
+    @property
+    def num_moves(self) -> int:
+        """
+        Returns the number of pieces placed during the game.
+        """
+        return sum(move is not None for move in self.moves)
+
+
+@dataclass
+class SimStats:
+    """
+    Accumulated counters and per-phase timings (in seconds) for
+    a batch of simulated games.
+    """
+
+    games: int = 0
+    moves: int = 0
+    retirements: int = 0
+    total_time: float = 0.0
+    generate_time: float = 0.0
+    policy_time: float = 0.0
+    place_time: float = 0.0
+
+    @property
+    def games_per_sec(self) -> float:
+        """
+        Returns the number of games completed per second.
+        """
+        return self.games / self.total_time if self.total_time else 0.0
+
+    @property
+    def moves_per_sec(self) -> float:
+        """
+        Returns the number of pieces placed per second.
+        """
+        return self.moves / self.total_time if self.total_time else 0.0
+
+    def report(self) -> str:
+        """
+        Returns a human-readable summary of the statistics.
+        """
+        total = self.total_time or 1.0
+        other = self.total_time - (
+            self.generate_time + self.policy_time + self.place_time)
+        lines = [
+            f"games: {self.games}  moves: {self.moves}  "
+            f"retirements: {self.retirements}",
+            f"time: {self.total_time:.3f}s  "
+            f"games/sec: {self.games_per_sec:.2f}  "
+            f"moves/sec: {self.moves_per_sec:.1f}",
+        ]
+        for name, spent in [("move generation", self.generate_time),
+                            ("policy", self.policy_time),
+                            ("placement", self.place_time),
+                            ("other", other)]:
+            lines.append(f"  {name:<16}{spent:9.3f}s {100 * spent / total:6.1f}%")
+        return "\n".join(lines)
+
+
+def play_game(preset: str, seed: int, policy: Policy = random_policy,
+              stats: Optional[SimStats] = None) -> GameResult:
+    """
+    Plays one complete game of the named preset, seeding the
+    policy's random number generator with seed. If stats is
+    given, the game's counters and timings are added to it.
+
+    Raises ValueError if the policy chooses an illegal move.
+    """
+    if stats is None:
+        stats = SimStats()
+    game = new_game(preset)
+    rng = random.Random(seed)
+    moves: list[Optional[Placement]] = []
+    clock = time.perf_counter
+
+    start = clock()
+    while not game.game_over:
+        t0 = clock()
+        legal = game.legal_placements()
+        t1 = clock()
+        stats.generate_time += t1 - t0
+
+        if not legal:
+            game.retire()
+            moves.append(None)
+            stats.retirements += 1
+            continue
+
+        move = policy(game, legal, rng)
+        t2 = clock()
+        if not game.maybe_place(move):
+            raise ValueError(f"Policy chose an illegal move: {move}")
+        t3 = clock()
+        stats.policy_time += t2 - t1
+        stats.place_time += t3 - t2
+        moves.append(move)
+        stats.moves += 1
+    duration = clock() - start
+
+    winners = game.winners
+    assert winners is not None
+    result = GameResult(
+        preset=preset,
+        seed=seed,
+        winners=winners,
+        scores=[game.get_score(p) for p in range(1, game.num_players + 1)],
+        moves=moves,
+        duration=duration,
+    )
+    stats.games += 1
+    stats.total_time += duration
+    return result
+
+
+def simulate(preset: str, games: int, seed: int = 0,
+             policy: Policy = random_policy) -> SimStats:
+    """
+    Plays the given number of games of the named preset, with
+    seeds seed, seed + 1, ..., and returns their statistics.
+    """
+    stats = SimStats()
+    for i in range(games):
+        play_game(preset, seed + i, policy, stats)
+    return stats
+
+
+@click.command()
+@click.option('--game', default = 'classic-4', type = click.Choice(list(PRESETS), case_sensitive = False), help = 'Preset to simulate')
+@click.option('-g', '--games', default = 100, type = int, help = 'Number of games')
+@click.option('--seed', default = 0, type = int, help = 'Seed of the first game')
+def main(game: str, games: int, seed: int) -> None:
+    """
+    Simulate random games and report throughput
+    """
+    stats = simulate(game.lower(), games, seed)
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
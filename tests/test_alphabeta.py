@@ -0,0 +1,58 @@
+"""
+Tests for the alpha-beta bot.
+"""
+import random
+import time
+
+from alphabeta import AlphaBetaBot
+from blokus import Blokus
+from endgame import EndgameSolver
+from mcts import play, random_move
+from presets import new_game
+
+
+def late_game(seed: int, moves: int) -> Blokus:
+    """
+    Returns a random duo game played until the player to move can
+    move and the players have at most the given number of legal
+    moves between them.
+    """
+    rng = random.Random(seed)
+    game = new_game("duo")
+    while not game.game_over:
+        if (game.legal_placements() and sum(
+                len(game.legal_placements(p)) for p in (1, 2)) <= moves):
+            break
+        play(game, random_move(game, rng))
+    return game
+
+
+def test_stops_deepening_once_the_tree_is_exhausted() -> None:
+    for seed in range(5):
+        game = late_game(seed, 12)
+        if game.game_over:
+            continue
+        bot = AlphaBetaBot(time_limit=60.0)
+        move = bot(game, game.legal_placements(), random.Random(0))
+        assert bot.depth < bot.max_depth
+        assert bot.elapsed < 30.0
+
+        # With two players the search is exact at the end of the game.
+        solver = EndgameSolver()
+        best = solver.solve(game).value
+        mover = game.curr_player
+        play(game, move)
+        value = solver.solve(game).value
+        assert (value if game.curr_player == mover else -value) == best
+
+
+def test_respects_its_time_limit() -> None:
+    rng = random.Random(1)
+    game = new_game("duo")
+    for _ in range(12):
+        moves = game.legal_placements()
+        bot = AlphaBetaBot(time_limit=0.2)
+        start = time.perf_counter()
+        move = bot(game, moves, rng)
+        assert time.perf_counter() - start < 0.3
+        play(game, move)
@@ -0,0 +1,186 @@
+"""
+Tests for the bitboard engine: move generation, undo and Zobrist
+hashing.
+"""
+import random
+from typing import Iterator
+
+import pytest
+
+from bitboard import squares_mask
+from blokus import Blokus
+from mcts import play, random_move
+from orientations import ORIENTATIONS, Placement
+from presets import new_game
+from shape_definitions import ShapeKind
+from zobrist import DEFAULT_SEED, position_hash, zobrist_keys
+
+# Small boards, with start positions in the corners and middle.
+BOARDS = [
+    (1, 7, {(3, 3)}),
+    (2, 7, {(0, 0), (6, 6)}),
+    (2, 9, {(2, 2), (6, 6)}),
+    (3, 9, {(0, 0), (0, 8), (8, 0)}),
+    (4, 10, {(0, 0), (0, 9), (9, 0), (9, 9)}),
+]
+
+
+def games(game: Blokus, seed: int) -> Iterator[Blokus]:
+    """
+    Plays random moves on the game until it is over, yielding it
+    before each move and at the end.
+    """
+    rng = random.Random(seed)
+    while not game.game_over:
+        yield game
+        play(game, random_move(game, rng))
+    yield game
+
+
+def brute_force_moves(game: Blokus, player: int) -> set[Placement]:
+    """
+    Returns the legal placements of the player, found by trying
+    every orientation of every remaining shape at every position
+    with legal_to_place.
+    """
+    moves = set()
+    size = game.size
+    for kind in game.remaining_shapes(player):
+        for orientation in ORIENTATIONS[kind]:
+            for top in range(size - orientation.height + 1):
+                for left in range(size - orientation.width + 1):
+                    placement = Placement(orientation,
+                                          (top + orientation.origin[0],
+                                           left + orientation.origin[1]))
+                    if game.legal_to_place(placement):
+                        moves.add(placement)
+    return moves
+
+
+def state(game: Blokus) -> tuple:
+    """
+    Returns the observable state of a game.
+    """
+    players = range(1, game.num_players + 1)
+    return (game.grid, game.curr_player, set(game.retired_players),
+            game.zobrist_hash, game.game_over, game.winners,
+            [game.get_score(p) for p in players],
+            [game.remaining_mask(p) for p in players],
+            [sorted(game.frontier_squares(p)) for p in players])
+
+
+def scratch_hash(game: Blokus) -> int:
+    """
+    Computes the hash of the game's position from its grid.
+    """
+    players = range(game.num_players + 1)
+    masks = [squares_mask([(r, c) for r, row in enumerate(game.grid)
+                           for c, cell in enumerate(row)
+                           if cell is not None and cell[0] == p], game.size)
+             for p in players]
+    remaining = [0] + [game.remaining_mask(p) for p in players if p]
+    keys = zobrist_keys(game.size, game.num_players, DEFAULT_SEED)
+    one_bonus = [p for p in players
+                 if p and not remaining[p] and game.get_score(p) == 20]
+    return position_hash(keys, masks, remaining, game.curr_player,
+                         game.retired_players, one_bonus)
+
+
+@pytest.mark.parametrize("num_players, size, starts", BOARDS)
+def test_legal_placements_match_brute_force(num_players: int, size: int,
+                                            starts: set) -> None:
+    for seed in range(3):
+        game = Blokus(num_players, size, set(starts))
+        for position in games(game, seed):
+            if position.game_over:
+                break
+            # The player to move cannot currently be retired.
+            player = position.curr_player
+            moves = position.legal_placements()
+            assert len(moves) == len(set(moves))
+            assert set(moves) == brute_force_moves(position, player)
+
+
+def test_legal_to_place_agrees_for_pieces() -> None:
+    game = new_game("duo")
+    rng = random.Random(5)
+    for position in games(game, 5):
+        if position.game_over:
+            break
+        for placement in rng.sample(position.legal_placements(),
+                                    min(5, len(position.legal_placements()))):
+            assert position.legal_to_place(placement.to_piece())
+
+
+@pytest.mark.parametrize("preset", ["duo", "classic-4"])
+def test_undo_restores_state_and_hash(preset: str) -> None:
+    game = new_game(preset)
+    history = [state(position) for position in games(game, 11)]
+    plies = len(history) - 1
+    for expected in reversed(history[:-1]):
+        game.undo()
+        assert state(game) == expected
+    assert plies > 0
+    with pytest.raises(ValueError):
+        game.undo()
+
+
+@pytest.mark.parametrize("preset", ["mono", "duo", "classic-3", "classic-4"])
+def test_incremental_hash_matches_position_hash(preset: str) -> None:
+    for position in games(new_game(preset), 3):
+        assert position.zobrist_hash == scratch_hash(position)
+
+
+
+def test_hash_depends_on_whether_one_was_played_last() -> None:
+    # Playing every shape scores 5 more with ONE last, so positions
+    # that differ only in the order of the last two shapes differ.
+    game = Blokus(1, 20, {(0, 0)})
+    for kind in ShapeKind:
+        if kind not in (ShapeKind.ONE, ShapeKind.X):
+            game.maybe_place(next(placement for placement in
+                                  game.legal_placements()
+                                  if placement.kind == kind))
+    ones = [p for p in game.legal_placements() if p.kind == ShapeKind.ONE]
+    xs = [p for p in game.legal_placements() if p.kind == ShapeKind.X]
+    one, x = next((one, x) for one in ones for x in xs
+                  if not set(one.squares()) & set(x.squares())
+                  and not set(one.squares()) & set(x.cardinal_neighbors()))
+
+    finished = []
+    for moves in ((one, x), (x, one)):
+        game.replay(moves, check=True)
+        finished.append((game.zobrist_hash, game.get_score(1)))
+        assert game.zobrist_hash == scratch_hash(game)
+        game.undo()
+        game.undo()
+    assert finished[1][1] == finished[0][1] + 5
+    assert finished[0][0] != finished[1][0]
+
+
+@pytest.mark.parametrize("preset", ["duo", "classic-4"])
+def test_corner_mobility_counts_covering_placements(preset: str) -> None:
+    # Undos and nearby moves must invalidate the cached counts.
+    rng = random.Random(7)
+    game = new_game(preset)
+    plies = 0
+    while not game.game_over:
+        for player in range(1, game.num_players + 1):
+            if player in game.retired_players:
+                continue
+            placements = game.legal_placements(player)
+            covering: dict[tuple[int, int], int] = {}
+            for placement in placements:
+                for square in placement.squares():
+                    covering[square] = covering.get(square, 0) + 1
+            mobility = game.corner_mobility(player)
+            assert mobility == {square: covering.get(square, 0)
+                                for square in game.frontier_squares(player)}
+            assert game.mobility(player) >= len(placements)
+        if plies >= 2 and rng.random() < 0.2:
+            game.undo()
+            game.undo()
+            plies -= 2
+        else:
+            play(game, random_move(game, rng))
+            plies += 1
@@ -0,0 +1,56 @@
+"""
+Tests for memory-mapped board-state datasets.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from dataset import export_dataset, load_shard, num_shards
+from game_log import GameLogWriter, read_games
+from game_record import GameRecord, encode_move
+from simulate import play_game
+
+
+def test_export_dataset(tmp_path: Path) -> None:
+    log, directory = str(tmp_path / "log"), str(tmp_path / "dataset")
+    records = [GameRecord.from_result(play_game("duo", seed))
+               for seed in range(3)]
+    with GameLogWriter(log) as writer:
+        for record in records:
+            writer.write(record)
+
+    rows = sum(len(record.moves) for record in records)
+    shard_size = 32
+    assert rows % shard_size
+    assert export_dataset(read_games(log), directory, shard_size) == rows
+    assert num_shards(directory) == -(-rows // shard_size)
+
+    shards = [load_shard(directory, n) for n in range(num_shards(directory))]
+    for n, shard in enumerate(shards):
+        length = shard_size if n < len(shards) - 1 else rows % shard_size
+        assert shard["planes"].shape == (length, 2, 14, 14)
+        assert shard["planes"].dtype == np.uint8
+        assert shard["remaining"].shape == (length, 2)
+        assert shard["remaining"].dtype == np.uint32
+        assert shard["to_move"].shape == (length,)
+        assert shard["to_move"].dtype == np.uint8
+        assert shard["move"].shape == (length,)
+        assert shard["move"].dtype == np.uint16
+        assert shard["outcome"].shape == (length, 2)
+        assert shard["outcome"].dtype == np.int8
+
+    # Rows run through the games in order.
+    record = records[1]
+    ply = 9
+    row = len(records[0].moves) + ply
+    shard = shards[row // shard_size]
+    row %= shard_size
+    game = record.replay(plies=ply)
+    for player in (1, 2):
+        expected = [[cell is not None and cell[0] == player for cell in line]
+                    for line in game.grid]
+        assert (shard["planes"][row, player - 1] == expected).all()
+        assert shard["remaining"][row, player - 1] == game.remaining_mask(player)
+    assert shard["to_move"][row] == game.curr_player
+    assert shard["move"][row] == encode_move(record.moves[ply], record.size)
+    assert list(shard["outcome"][row]) == record.scores
@@ -0,0 +1,57 @@
+"""
+Tests for the endgame solver and policy.
+"""
+import random
+import time
+
+import pytest
+
+from blokus import Blokus
+from endgame import EndgamePolicy, EndgameSolver, Solution, SolverLimit
+from mcts import play
+from presets import new_game
+from simulate import random_policy
+
+
+def test_solver_stops_at_its_time_limit() -> None:
+    game = new_game("duo")
+    solver = EndgameSolver(time_limit=0.05)
+    start = time.perf_counter()
+    with pytest.raises(SolverLimit):
+        solver.solve(game)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_policy_respects_its_time_limit_and_backs_off() -> None:
+    rng = random.Random(0)
+    game = new_game("classic-4")
+    policy = EndgamePolicy(random_policy, threshold=200, time_limit=0.05,
+                           retry_after=4)
+    solve = policy.solver.solve
+    solves: list[tuple[int, bool]] = []
+
+    def counted_solve(game: Blokus) -> Solution:
+        placed = sum(21 - game.remaining_mask(p).bit_count() for p in range(1, 5))
+        try:
+            solution = solve(game)
+        except SolverLimit:
+            solves.append((placed, False))
+            raise
+        solves.append((placed, True))
+        return solution
+
+    policy.solver.solve = counted_solve  # type: ignore[method-assign]
+    while not game.game_over:
+        moves = game.legal_placements()
+        if not moves:
+            play(game, None)
+            continue
+        start = time.perf_counter()
+        move = policy(game, moves, rng)
+        assert time.perf_counter() - start < 0.5
+        play(game, move)
+
+    assert any(not solved for _, solved in solves)
+    for (placed, solved), (later, _) in zip(solves, solves[1:]):
+        if not solved:
+            assert later >= placed + 4
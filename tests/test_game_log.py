@@ -0,0 +1,79 @@
+"""
+Tests for sharded game logs.
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from game_log import LENGTH, GameLogWriter, read_games, read_shard, shard_paths
+from game_record import GameRecord
+from simulate import play_game
+
+
+@pytest.fixture(scope="module")
+def records() -> list[GameRecord]:
+    return [GameRecord.from_result(play_game("duo", seed))
+            for seed in range(7)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(tmp_path: Path, records: list[GameRecord],
+                    compress: bool) -> None:
+    with GameLogWriter(str(tmp_path), compress=compress) as writer:
+        for record in records:
+            writer.write(record)
+    assert len(shard_paths(str(tmp_path))) == 1
+    assert list(read_games(str(tmp_path))) == records
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_shards_roll_over_at_shard_size(tmp_path: Path,
+                                        records: list[GameRecord],
+                                        compress: bool) -> None:
+    with GameLogWriter(str(tmp_path), shard_size=3,
+                       compress=compress) as writer:
+        for record in records:
+            writer.write(record)
+    paths = shard_paths(str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == \
+        ["000000.bklog", "000001.bklog", "000002.bklog"]
+    assert [len(list(read_shard(path))) for path in paths] == [3, 3, 1]
+    assert list(read_games(str(tmp_path))) == records
+
+
+def test_writers_resume_after_existing_shards(tmp_path: Path,
+                                              records: list[GameRecord]) -> None:
+    with GameLogWriter(str(tmp_path), shard_size=2) as writer:
+        for record in records[:3]:
+            writer.write(record)
+    with GameLogWriter(str(tmp_path), shard_size=2, compress=True) as writer:
+        for record in records[3:]:
+            writer.write(record)
+    paths = shard_paths(str(tmp_path))
+    assert [os.path.basename(path)[:6] for path in paths] == \
+        ["000000", "000001", "000002", "000003"]
+    assert list(read_games(str(tmp_path))) == records
+
+
+def test_truncated_last_record_is_skipped(tmp_path: Path,
+                                          records: list[GameRecord]) -> None:
+    with GameLogWriter(str(tmp_path)) as writer:
+        for record in records[:3]:
+            writer.write(record)
+    (path,) = shard_paths(str(tmp_path))
+    size = os.path.getsize(path)
+    last = LENGTH.size + len(records[2].to_bytes())
+    # Cut into the record, then into its length, then at its start.
+    for cut in (1, last - LENGTH.size, last - 1, last):
+        with open(path, "r+b") as file:
+            file.truncate(size - cut)
+        assert list(read_shard(path)) == records[:2]
+
+
+def test_flushed_games_are_readable_while_writing(
+        tmp_path: Path, records: list[GameRecord]) -> None:
+    with GameLogWriter(str(tmp_path), flush_every=2, compress=True) as writer:
+        for record in records[:5]:
+            writer.write(record)
+        assert list(read_games(str(tmp_path))) == records[:4]
@@ -0,0 +1,50 @@
+"""
+Tests for the binary game record format.
+"""
+import dataclasses
+
+import pytest
+
+from game_record import GameRecord, decode_move, encode_move
+from orientations import ALL_ORIENTATIONS, Placement
+from presets import PRESETS
+from simulate import play_game
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_record_round_trip(preset: str) -> None:
+    for seed in range(3):
+        result = play_game(preset, seed)
+        record = GameRecord.from_result(result)
+        data = record.to_bytes()
+        assert GameRecord.from_bytes(data) == record
+        game = GameRecord.from_bytes(data).replay(check=True)
+        scores = [game.get_score(p) for p in range(1, game.num_players + 1)]
+        assert scores == result.scores
+        if preset == "classic-4":
+            assert len(data) < 200
+
+
+def test_custom_variant_round_trip() -> None:
+    record = GameRecord.from_result(play_game("duo", 1))
+    custom = dataclasses.replace(record, preset=None)
+    assert GameRecord.from_bytes(custom.to_bytes()) == custom
+
+
+def test_move_codes() -> None:
+    for orientation in ALL_ORIENTATIONS:
+        placement = Placement(orientation, (orientation.origin[0] + 3,
+                                            orientation.origin[1] + 5))
+        code = encode_move(placement, 20)
+        assert decode_move(code, 20) == placement
+        assert encode_move(placement.to_piece(), 20) == code
+    assert decode_move(encode_move(None, 20), 20) is None
+
+
+def test_replay_checks_scores() -> None:
+    record = GameRecord.from_result(play_game("duo", 2))
+    wrong = dataclasses.replace(record, scores=[s + 1 for s in record.scores])
+    with pytest.raises(ValueError):
+        wrong.replay()
+    with pytest.raises(ValueError):
+        GameRecord.from_bytes(record.to_bytes()[:-1])
@@ -0,0 +1,39 @@
+"""
+Tests for the NumPy move generation backend.
+"""
+import random
+
+import pytest
+
+import numpy_moves
+from mcts import play, random_move
+from presets import PRESETS, new_game
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_same_moves_as_legal_placements(preset: str) -> None:
+    for seed in range(3):
+        rng = random.Random(seed)
+        game = new_game(preset)
+        while True:
+            for player in range(1, game.num_players + 1):
+                moves = numpy_moves.legal_placements(game, player)
+                assert len(moves) == len(set(moves))
+                assert set(moves) == set(game.legal_placements(player))
+            if game.game_over:
+                break
+            play(game, random_move(game, rng))
+
+
+def test_available_moves_backend() -> None:
+    game = new_game("duo")
+    play(game, game.legal_placements()[0])
+
+    def footprints(pieces: set) -> set:
+        return {(piece.shape.kind, frozenset(piece.squares()))
+                for piece in pieces}
+
+    assert (footprints(game.available_moves("numpy"))
+            == footprints(game.available_moves()))
+    with pytest.raises(ValueError):
+        game.available_moves("fortran")
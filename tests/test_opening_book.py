@@ -0,0 +1,68 @@
+"""
+Tests for memory-mapped opening books.
+"""
+from pathlib import Path
+
+import pytest
+
+from mcts import score_rewards
+from opening_book import OpeningBook, build_book
+from orientations import Placement
+from presets import new_game
+from simulate import play_game
+
+
+def test_build_and_look_up(tmp_path: Path) -> None:
+    preset, plies = "classic-3", 3
+    results = [play_game(preset, seed) for seed in range(30)]
+    path = str(tmp_path / "book")
+    count = build_book(preset, results, plies, path, min_visits=2)
+
+    # Aggregate the same statistics directly.
+    visits: dict[int, int] = {}
+    rewards: dict[int, list[float]] = {}
+    moves: dict[int, dict[Placement, list[float]]] = {}
+    for result in results:
+        outcome = score_rewards(result.scores)
+        game = new_game(preset)
+        for move in result.moves[:plies]:
+            key = game.zobrist_hash
+            visits[key] = visits.get(key, 0) + 1
+            totals = rewards.setdefault(key, [0.0] * 3)
+            for i, reward in enumerate(outcome):
+                totals[i] += reward
+            stats = moves.setdefault(key, {}).setdefault(move, [0, 0.0])
+            stats[0] += 1
+            stats[1] += outcome[game.curr_player - 1]
+            game.replay((move,))
+    assert count == len(visits)
+
+    with OpeningBook(path) as book:
+        assert len(book) == count
+        assert (book.size, book.num_players, book.plies) == (20, 3, plies)
+        chosen = unchosen = 0
+        for key, expected in visits.items():
+            entry = book.lookup(key)
+            assert entry is not None
+            assert entry.visits == expected
+            assert len(entry.rewards) == 3
+            assert entry.rewards == pytest.approx(rewards[key])
+            means = {move: total / n for move, (n, total) in moves[key].items()
+                     if n >= 2}
+            if means:
+                assert entry.best_move in means
+                assert means[entry.best_move] == max(means.values())
+                chosen += 1
+            else:
+                assert entry.best_move is None
+                unchosen += 1
+        assert chosen and unchosen
+
+        for missing in (0, (1 << 64) - 1, min(visits) - 1, max(visits) + 1):
+            if missing not in visits:
+                assert book.lookup(missing) is None
+
+        game = new_game(preset)
+        root = book.lookup(game.zobrist_hash)
+        assert root is not None and root.visits == len(results)
+        assert book.best_move(game) == root.best_move
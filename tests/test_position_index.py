@@ -0,0 +1,87 @@
+"""
+Tests for the SQLite position index.
+"""
+from pathlib import Path
+import sqlite3
+from typing import Optional
+
+from game_record import GameRecord
+from orientations import Placement
+from position_index import PositionIndex, _key
+from presets import new_game
+from simulate import play_game
+
+
+def records() -> list[GameRecord]:
+    return [GameRecord.from_result(play_game("duo", seed))
+            for seed in range(12)]
+
+
+def dump(path: str) -> tuple[list, list]:
+    db = sqlite3.connect(path)
+    tables = (db.execute("SELECT * FROM positions ORDER BY 1, 2").fetchall(),
+              db.execute("SELECT * FROM continuations ORDER BY 1, 2, 3").fetchall())
+    db.close()
+    return tables
+
+
+def test_batches_add_up(tmp_path: Path) -> None:
+    games = records()
+    once, batched, split = (str(tmp_path / name)
+                            for name in ("once.db", "batched.db", "split.db"))
+    with PositionIndex(once) as index:
+        assert index.add_games(games, plies=6) == len(games)
+    with PositionIndex(batched) as index:
+        assert index.add_games(games, plies=6, batch_size=5) == len(games)
+    with PositionIndex(split) as index:
+        index.add_games(games[:7], plies=6)
+    with PositionIndex(split) as index:
+        index.add_games(games[7:], plies=6)
+    assert dump(once) == dump(batched) == dump(split)
+
+
+def test_lookup_and_continuations(tmp_path: Path) -> None:
+    games = records()
+    with PositionIndex(str(tmp_path / "index.db")) as index:
+        index.add_games(games, plies=6)
+        game = new_game("duo")
+
+        won = [[score == max(record.scores) for score in record.scores]
+               for record in games]
+        stats = index.lookup(game)
+        assert stats is not None
+        assert stats.visits == len(games)
+        assert stats.wins == [sum(w[seat] for w in won) for seat in (0, 1)]
+
+        expected: dict[Optional[Placement], tuple[int, int]] = {}
+        for record, w in zip(games, won):
+            visits, wins = expected.get(record.moves[0], (0, 0))
+            expected[record.moves[0]] = (visits + 1, wins + w[0])
+        continuations = index.continuations(game)
+        assert {c.move: (c.visits, c.wins) for c in continuations} == expected
+        assert [c.visits for c in continuations] == \
+            sorted((c.visits for c in continuations), reverse=True)
+        assert len(index.continuations(game, limit=2)) == min(2, len(expected))
+
+        # Positions past the indexed plies are not in the index.
+        late = games[0].replay(plies=7)
+        assert index.lookup(late) is None
+
+
+def test_keys_cover_the_full_hash_range(tmp_path: Path) -> None:
+    for h in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        key = _key(h)
+        assert -(1 << 63) <= key < 1 << 63
+        assert key % (1 << 64) == h
+
+    # Some indexed positions hash to 2^63 or more, and are found.
+    games = records()
+    with PositionIndex(str(tmp_path / "index.db")) as index:
+        index.add_games(games, plies=6)
+        high = 0
+        for record in games:
+            for ply in range(6):
+                game = record.replay(plies=ply)
+                high += game.zobrist_hash >= 1 << 63
+                assert index.lookup(game) is not None
+        assert high
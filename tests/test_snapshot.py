@@ -0,0 +1,78 @@
+"""
+Tests for Blokus.to_bytes and Blokus.from_bytes.
+"""
+import random
+
+import pytest
+
+from blokus import Blokus
+from mcts import play, random_move
+from presets import PRESETS, new_game
+from shape_definitions import ShapeKind
+
+
+def state(game: Blokus) -> tuple:
+    """
+    Returns the observable state of a game.
+    """
+    players = range(1, game.num_players + 1)
+    return (game.grid, game.curr_player, game.retired_players,
+            game.zobrist_hash, game.game_over, game.winners,
+            [game.get_score(p) for p in players],
+            [game.remaining_mask(p) for p in players],
+            [sorted(game.frontier_squares(p)) for p in players],
+            set(game.legal_placements()))
+
+
+def finished_with_one(count: int) -> list[Blokus]:
+    """
+    Returns count one-player games in which the player has played
+    every shape, ShapeKind.ONE last.
+    """
+    games = []
+    for seed in range(1000):
+        rng = random.Random(seed)
+        game = Blokus(1, 20, {(0, 0)})
+        while not game.game_over:
+            moves = game.legal_placements()
+            others = [m for m in moves if m.kind != ShapeKind.ONE]
+            if not moves or (not others and len(game.remaining_shapes(1)) > 1):
+                break
+            play(game, rng.choice(others or moves))
+        if game.get_score(1) == 20:
+            games.append(game)
+            if len(games) == count:
+                return games
+    raise AssertionError("too few games finished with ShapeKind.ONE")
+
+
+@pytest.mark.parametrize("preset", list(PRESETS))
+def test_round_trip_during_game(preset: str) -> None:
+    rng = random.Random(7)
+    game = new_game(preset)
+    while True:
+        restored = Blokus.from_bytes(game.to_bytes())
+        assert state(restored) == state(game)
+        if game.game_over:
+            break
+        play(game, random_move(game, rng))
+
+
+def test_round_trip_twice_keeps_one_bonus() -> None:
+    for game in finished_with_one(10):
+        once = Blokus.from_bytes(game.to_bytes())
+        twice = Blokus.from_bytes(once.to_bytes())
+        assert once.get_score(1) == twice.get_score(1) == 20
+        assert twice.to_bytes() == game.to_bytes()
+        assert state(twice) == state(game)
+
+
+def test_classic_snapshot_size() -> None:
+    assert len(new_game("classic-4").to_bytes()) == 173
+
+
+def test_invalid_snapshots() -> None:
+    data = new_game("duo").to_bytes()
+    for bad in (b"", data[:-1], bytes([2]) + data[1:]):
+        with pytest.raises(ValueError):
+            Blokus.from_bytes(bad)
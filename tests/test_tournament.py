@@ -0,0 +1,43 @@
+"""
+Tests for tournament scheduling and standings.
+"""
+from collections import Counter
+
+import pytest
+
+from tournament import Standings, schedule
+
+
+def test_two_bots_fill_every_preset() -> None:
+    matches = schedule(["a", "b"], ["duo", "classic-3", "classic-4"], 2)
+    by_preset = Counter(match.preset for match in matches)
+    assert by_preset == {"duo": 4, "classic-3": 6, "classic-4": 8}
+    for match in matches:
+        assert set(match.seats) == {"a", "b"}
+    for preset in ("classic-3", "classic-4"):
+        seatings = [m.seats for m in matches if m.preset == preset]
+        for seat in range(len(seatings[0])):
+            assert {seats[seat] for seats in seatings} == {"a", "b"}
+    assert [match.seed for match in matches] == list(range(len(matches)))
+
+
+def test_groups_of_distinct_bots() -> None:
+    matches = schedule(["a", "b", "c", "d", "e"], ["classic-4"], 1)
+    assert len(matches) == 5 * 4
+    assert all(len(set(match.seats)) == 4 for match in matches)
+
+
+def test_unfillable_schedules_raise() -> None:
+    with pytest.raises(ValueError):
+        schedule(["a", "b"], ["mono"], 1)
+    with pytest.raises(ValueError):
+        schedule(["a"], ["duo"], 1)
+
+
+def test_repeated_bot_rating_is_zero_sum() -> None:
+    standings = Standings()
+    standings.update({"seats": ["a", "b", "a", "b"], "scores": [5, 3, 1, -2],
+                      "winners": [1]})
+    assert standings.ratings["a"] > 1500 > standings.ratings["b"]
+    assert standings.ratings["a"] + standings.ratings["b"] == pytest.approx(3000)
+    assert standings.games == {"a": 2, "b": 2}
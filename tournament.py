@@ -0,0 +1,278 @@
+"""
+Round-robin bot tournaments.
+
+Every group of registered bots large enough to fill a preset's
+seats plays games in every rotation of the seating, which cancels
+out the first-move advantage. Games run on a process pool. As each
+game finishes, its result is appended to a JSON lines file and the
+Elo ratings and score table are updated.
+
+Usage:
+
+    python tournament.py --bots random,mcts,alphabeta \\
+        --game duo --game classic-4 --games 4 results.jsonl
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import combinations
+import json
+import os
+import random
+import time
+from typing import Callable, Iterator, Optional, TextIO
+
+import click
+
+from alphabeta import AlphaBetaBot
+from blokus import Blokus
+from endgame import EndgamePolicy
+from mcts import MCTSBot
+from orientations import Placement
+from presets import PRESETS
+from simulate import Policy, play_game, random_policy
+
+
+def _random_bot() -> Policy:
+    """
+    Returns the uniformly random policy.
+    """
+    return random_policy
+
+
+# Bots are registered by name as factories, so that every game
+# gets fresh policy instances (and fresh search trees).
+BOTS: dict[str, Callable[[], Policy]] = {
+    "random": _random_bot,
+    "mcts": partial(MCTSBot, time_limit=0.2),
+    "alphabeta": partial(AlphaBetaBot, time_limit=0.2, max_moves=12),
+    "endgame": partial(EndgamePolicy, random_policy),
+}
+
+
+def register_bot(name: str, factory: Callable[[], Policy]) -> None:
+    """
+    Registers a bot under the given name. The factory must be
+    picklable (e.g., a module-level function or a partial of a
+    module-level class) to be usable from worker processes.
+    """
+    BOTS[name] = factory
+
+
+# Each worker process keeps the factories of the competing bots,
+# set up once by _init_worker.
+_worker_bots: dict[str, Callable[[], Policy]] = {}
+
+
+def _init_worker(bots: dict[str, Callable[[], Policy]]) -> None:
+    """
+    Stores the bot factories for the games played by this worker.
+    """
+    global _worker_bots
+    _worker_bots = bots
+
+
+class _SeatedPolicy:
+    """
+    Dispatches each turn to the policy of the player to move.
+    """
+
+    def __init__(self, policies: list[Policy]) -> None:
+        """
+        Constructor
+        """
+        self.policies = policies
+
+    def __call__(self, game: Blokus, moves: list[Placement],
+                 rng: random.Random) -> Placement:
+        return self.policies[game.curr_player - 1](game, moves, rng)
+
+
+@dataclass
+class Match:
+    """
+    One scheduled game: seats[i] is the name of the bot playing
+    as player i + 1.
+    """
+
+    preset: str
+    seats: tuple[str, ...]
+    seed: int
+
+
+def _play_match(match: Match) -> dict:
+    """
+    Plays a match in a worker process and returns its record.
+    """
+    policy = _SeatedPolicy([_worker_bots[name]() for name in match.seats])
+    result = play_game(match.preset, match.seed, policy)
+    return {
+        "preset": match.preset,
+        "seed": match.seed,
+        "seats": list(match.seats),
+        "scores": result.scores,
+        "winners": result.winners,
+        "moves": result.num_moves,
+        "duration": round(result.duration, 3),
+    }
+
+
+def schedule(bots: list[str], presets: list[str], games: int,
+             seed: int = 0) -> list[Match]:
+    """
+    Returns the matches of a round robin: for each preset, each
+    group of distinct bots that fills the seats plays games rounds
+    of every rotation of its seating. With fewer bots than seats,
+    the bots are repeated in turn to fill them (e.g., a, b, a, b),
+    so two bots can be compared in a four-player game. Match i is
+    played with seed + i.
+
+    Raises ValueError if there are fewer than two bots, or if a
+    preset has fewer than two seats.
+    """
+    if len(bots) < 2:
+        raise ValueError("A tournament needs at least two bots.")
+    matches: list[Match] = []
+    for preset in presets:
+        seats = PRESETS[preset].num_players
+        if seats < 2:
+            raise ValueError(f"The {preset} preset has fewer than two seats.")
+        if len(bots) >= seats:
+            groups = list(combinations(bots, seats))
+        else:
+            groups = [tuple(bots[i % len(bots)] for i in range(seats))]
+        for group in groups:
+            for _ in range(games):
+                for shift in range(seats):
+                    seating = group[shift:] + group[:shift]
+                    matches.append(Match(preset, seating, seed + len(matches)))
+    return matches
+
+
+@dataclass
+class Standings:
+    """
+    Elo ratings and a score table, updated one game at a time.
+
+    Each game counts as a set of head-to-head results between
+    every pair of seats, decided by their scores. Rating changes
+    are scaled by the number of opponents, so a four-player game
+    moves ratings about as much as a two-player one. A bot that
+    fills several seats of a game is counted once per seat, and the
+    results between its own seats leave its rating unchanged.
+    """
+
+    k_factor: float = 24.0
+    initial: float = 1500.0
+    ratings: dict[str, float] = field(default_factory=dict)
+    games: dict[str, int] = field(default_factory=dict)
+    points: dict[str, float] = field(default_factory=dict)
+    total_score: dict[str, int] = field(default_factory=dict)
+
+    def update(self, record: dict) -> None:
+        """
+        Adds the result of one game (as returned by _play_match).
+        """
+        seats: list[str] = record["seats"]
+        scores: list[int] = record["scores"]
+        winners: list[int] = record["winners"]
+        for name in seats:
+            self.ratings.setdefault(name, self.initial)
+        for i, name in enumerate(seats):
+            self.games[name] = self.games.get(name, 0) + 1
+            self.total_score[name] = self.total_score.get(name, 0) + scores[i]
+            if i + 1 in winners:
+                self.points[name] = self.points.get(name, 0.0) + 1 / len(winners)
+
+        scale = self.k_factor / (len(seats) - 1)
+        changes = {name: 0.0 for name in seats}
+        for i, j in combinations(range(len(seats)), 2):
+            a, b = seats[i], seats[j]
+            expected = 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+            actual = (1.0 if scores[i] > scores[j]
+                      else 0.5 if scores[i] == scores[j] else 0.0)
+            changes[a] += scale * (actual - expected)
+            changes[b] -= scale * (actual - expected)
+        for name, change in changes.items():
+            self.ratings[name] += change
+
+    def table(self) -> str:
+        """
+        Returns the standings as a text table, best rating first.
+        """
+        lines = [f"{'bot':<16}{'elo':>8}{'games':>8}{'wins':>8}{'avg score':>11}"]
+        for name in sorted(self.ratings, key=self.ratings.__getitem__,
+                           reverse=True):
+            games = self.games[name]
+            lines.append(f"{name:<16}{self.ratings[name]:8.1f}{games:8d}"
+                         f"{self.points.get(name, 0.0):8.1f}"
+                         f"{self.total_score[name] / games:11.2f}")
+        return "\n".join(lines)
+
+
+def run_tournament(
+    matches: list[Match],
+    out: Optional[TextIO] = None,
+    standings: Optional[Standings] = None,
+    workers: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Plays the matches on a pool of worker processes (one per CPU
+    by default), and yields each game record as it finishes,
+    after writing it to out as a JSON line and adding it to the
+    standings. The factories of the competing bots are sent to
+    the workers once, so they must be picklable.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    names = {name for match in matches for name in match.seats}
+    bots = {name: BOTS[name] for name in names}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(bots,)) as pool:
+        futures = [pool.submit(_play_match, match) for match in matches]
+        for future in as_completed(futures):
+            record = future.result()
+            if out is not None:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            if standings is not None:
+                standings.update(record)
+            yield record
+
+
+@click.command()
+@click.option('--bots', default = 'random,mcts', help = 'Comma-separated bot names')
+@click.option('--game', 'games_', multiple = True, type = click.Choice(list(PRESETS), case_sensitive = False), help = 'Preset to play (repeatable, default duo)')
+@click.option('-g', '--games', default = 2, type = int, help = 'Rounds of seat rotations per group')
+@click.option('--seed', default = 0, type = int, help = 'Seed of the first game')
+@click.option('-w', '--workers', default = None, type = int, help = 'Worker processes (default: one per CPU)')
+@click.option('--every', default = 10, type = int, help = 'Print standings every N games')
+@click.argument('path')
+def main(bots: str, games_: tuple[str, ...], games: int, seed: int,
+         workers: Optional[int], every: int, path: str) -> None:
+    """
+    Run a round-robin tournament and write results to PATH
+    """
+    names = [name.strip() for name in bots.split(",")]
+    for name in names:
+        if name not in BOTS:
+            raise click.BadParameter(f"unknown bot {name!r}", param_hint="--bots")
+    presets = [game.lower() for game in games_] or ["duo"]
+    try:
+        matches = schedule(names, presets, games, seed)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+
+    standings = Standings()
+    start = time.perf_counter()
+    with open(path, "a") as out:
+        for count, _ in enumerate(run_tournament(matches, out, standings,
+                                                 workers), 1):
+            if count % every == 0 or count == len(matches):
+                elapsed = time.perf_counter() - start
+                print(f"\n{count}/{len(matches)} games, {elapsed:.1f}s")
+                print(standings.table())
+
+
+if __name__ == "__main__":
+    main()
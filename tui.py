@@ -7,7 +7,8 @@ import random
 import sys
 import click
 from blokus import Blokus
-from piece import Piece, ShapeKind, copy, Point
+from piece import Piece, ShapeKind, Point
+from presets import PRESETS
 
 ENTER_KEYS = [10, 13]
 ESC = 27
@@ -254,7 +255,7 @@ class TuiBoard:
         Shift the piece in any direction and return it unless there will be a 
         wall collision. If so, return the original state of the piece. 
         """
-        prev_state = copy.deepcopy(piece)
+        prev_state = piece.copy()
         old_x, old_y = piece.shape.origin
 
         x_diff = old_x + new_x
@@ -275,7 +276,7 @@ class TuiBoard:
         Rotate the piece right or left and return it unless there will be a wall 
         collision. If so, return the original state of the piece. 
         """
-        prev_state = copy.deepcopy(piece)
+        prev_state = piece.copy()
         old_x, old_y = piece.shape.origin
 
         if direction == "R":
@@ -308,7 +309,7 @@ class TuiBoard:
         Flip the piece horizontally and return it unless there will be a wall 
         collision. If so, return the original state of the piece. 
         """
-        prev_state = copy.deepcopy(piece)
+        prev_state = piece.copy()
         old_y = piece.shape.origin[1]
         piece.flip_horizontally()
         piece.shape.origin = (piece.shape.origin[0], -piece.shape.origin[1])
@@ -347,30 +348,15 @@ def start(screen: Any, size: int, num_player: int, start_positions: set[Point])
 @click.option('-s', '--size', default = 14, type = int, help = 'Size of the Blokus Board')
 @click.option('-n', '--num_players', default = 2, type = int, help = 'Number of players')
 @click.option('-p', '--start_position', default = ((4,4), (9,9)), multiple = True, nargs =2, type = int, help = 'Starting positions')
-@click.option('--game', type = click.Choice(['mono', 'duo', 'classic-2', 'classic-3', 'classic-4'], case_sensitive = False))
+@click.option('--game', type = click.Choice(list(PRESETS), case_sensitive = False))
 def board_creation(size: int, num_players: int, start_position: set[Point], game: str) -> None:
     """
     Gather information about the type of Blokus game from the terminal and send 
     it to the be processed into a Blokus game object
     """
     if game is not None:
-        if game == "mono":
-            size = 11
-            num_players = 1
-            start_position = {(5,5)}
-        elif game == "duo":
-            size = 14
-            num_players = 2
-            start_position = {(4,4), (9,9)}
-        else:
-            size = 20
-            start_position = {(0,0), (0,19), (19,0), (19,19)}
-            if game == "classic-2":
-                num_players = 2
-            elif game == "classic-3":
-                num_players = 3
-            elif game == "classic-4":
-                num_players = 4
+        size, num_players, starts = PRESETS[game.lower()]
+        start_position = set(starts)
     curses.wrapper(start, size, num_players, start_position)
 
 if __name__ == "__main__":
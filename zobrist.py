@@ -0,0 +1,100 @@
+"""
+Zobrist hashing of Blokus positions.
+
+A position's hash is the XOR of one random 64-bit key for each
+feature of the position:
+
+ - each occupied square, keyed by the player occupying it;
+ - the player to move;
+ - each retired player;
+ - each shape that each player has already played; and
+ - each player who has played every shape with ONE last, which
+   is worth 5 more points than any other last shape.
+
+Blokus updates its hash incrementally as features are added or
+removed (see Blokus.zobrist_hash). Keys are drawn from a seeded
+random.Random, so hashes are stable across processes for the
+same seed, board size and number of players.
+"""
+from functools import lru_cache
+import random
+from typing import Iterable, NamedTuple
+
+from bitboard import mask_bits
+from shape_definitions import ShapeKind
+
+DEFAULT_SEED = 20240142
+
+
+class ZobristKeys(NamedTuple):
+    """
+    Random keys for one board size and number of players.
+    Each list is indexed by player number first (index 0
+    is unused), then by bit index or shape kind index.
+    """
+
+    squares: list[list[int]]
+    to_move: list[int]
+    retired: list[int]
+    played: list[list[int]]
+    one_bonus: list[int]
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int, num_players: int,
+                 seed: int = DEFAULT_SEED) -> ZobristKeys:
+    """
+    Returns the Zobrist keys for the given board size and
+    number of players.
+    """
+    rng = random.Random(f"{seed}:{size}:{num_players}")
+    players = range(num_players + 1)
+    return ZobristKeys(
+        squares=[[rng.getrandbits(64) for _ in range(size * size)]
+                 for _ in players],
+        to_move=[rng.getrandbits(64) for _ in players],
+        retired=[rng.getrandbits(64) for _ in players],
+        played=[[rng.getrandbits(64) for _ in ShapeKind] for _ in players],
+        # Drawn last, so the other keys are unchanged.
+        one_bonus=[rng.getrandbits(64) for _ in players],
+    )
+
+
+def squares_hash(keys: ZobristKeys, player: int, mask: int) -> int:
+    """
+    Returns the XOR of the square keys for the given player
+    and the squares in the given mask.
+    """
+    player_keys = keys.squares[player]
+    h = 0
+    for index in mask_bits(mask):
+        h ^= player_keys[index]
+    return h
+
+
+def position_hash(
+    keys: ZobristKeys,
+    player_masks: list[int],
+    remaining: list[int],
+    curr_player: int,
+    retired_players: Iterable[int],
+    one_bonus: Iterable[int] = (),
+) -> int:
+    """
+    Computes the hash of a position from scratch. player_masks
+    and remaining are indexed by player number, as in Blokus;
+    remaining holds each player's mask of unplayed shapes (see
+    blokus.SHAPE_BITS). one_bonus holds the players who played
+    every shape with ONE last.
+    """
+    h = keys.to_move[curr_player]
+    for player in range(1, len(player_masks)):
+        h ^= squares_hash(keys, player, player_masks[player])
+        for i in range(len(ShapeKind)):
+            if not remaining[player] & (1 << i):
+                h ^= keys.played[player][i]
+    for player in retired_players:
+        h ^= keys.retired[player]
+    for player in one_bonus:
+        h ^= keys.one_bonus[player]
+    return h